@@ -0,0 +1,145 @@
+# Outils communs des benchmarks : Redis en mémoire (fakeredis + Lua), comptage des
+# allers-retours, mesure des latences / mémoire et stockage des résultats.
+import json
+import os
+import statistics
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, List, NamedTuple, Optional
+
+from fakeredis import aioredis
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+class CountingConnection(aioredis.FakeAsyncRedisConnection):
+    # Un envoi = un aller-retour (une commande, un pipeline ou un EVALSHA)
+    round_trips = 0
+
+    async def send_packed_command(self, *args, **kwargs):
+        CountingConnection.round_trips += 1
+        return await super().send_packed_command(*args, **kwargs)
+
+
+def make_redis():
+    return aioredis.FakeRedis(connection_class=CountingConnection, decode_responses=True)
+
+
+class BenchResult(NamedTuple):
+    name: str
+    ops: int
+    ops_per_sec: float
+    p50_ms: float
+    p99_ms: float
+    round_trips: float  # par opération
+    peak_kb: float      # pic tracemalloc d'une opération
+
+    def row(self) -> str:
+        return (
+            f"{self.name:<32} {self.ops_per_sec:>12,.1f} ops/s   p50 {self.p50_ms:>9.3f} ms   "
+            f"p99 {self.p99_ms:>9.3f} ms   {self.round_trips:>7.1f} rt/op   {self.peak_kb:>9,.1f} KiB"
+        )
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def measure(
+    name: str,
+    op: Callable[[int], Awaitable[None]],
+    iterations: int,
+    setup: Optional[Callable[[int], Awaitable[None]]] = None,
+    warmup: int = 1,
+) -> BenchResult:
+    # op(i) est une opération ; setup(i) (non chronométré) remet l'état à zéro avant chaque op
+    for i in range(warmup):
+        if setup:
+            await setup(-1 - i)
+        await op(-1 - i)
+
+    latencies = []
+    round_trips = 0
+    for i in range(iterations):
+        if setup:
+            await setup(i)
+        before = CountingConnection.round_trips
+        started = time.perf_counter()
+        await op(i)
+        latencies.append(time.perf_counter() - started)
+        round_trips += CountingConnection.round_trips - before
+
+    # Mémoire mesurée à part : tracemalloc fausserait les latences
+    if setup:
+        await setup(iterations)
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        current, _ = tracemalloc.get_traced_memory()
+        await op(iterations)
+        peak = tracemalloc.get_traced_memory()[1] - current
+    finally:
+        tracemalloc.stop()
+
+    total = sum(latencies)
+    return BenchResult(
+        name=name,
+        ops=iterations,
+        ops_per_sec=iterations / total if total > 0 else 0.0,
+        p50_ms=statistics.median(latencies) * 1000,
+        p99_ms=percentile(latencies, 0.99) * 1000,
+        round_trips=round_trips / iterations,
+        peak_kb=peak / 1024,
+    )
+
+
+# --- Stockage / comparaison des résultats ---
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(RESULTS_DIR),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def save_results(results: List[BenchResult], label: str, params: dict) -> str:
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"{label}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "label": label,
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "params": params,
+            "results": [r._asdict() for r in results],
+        }, f, indent=2)
+    return path
+
+
+def latest_baseline(exclude: str) -> Optional[str]:
+    if not os.path.isdir(RESULTS_DIR):
+        return None
+    files = [
+        os.path.join(RESULTS_DIR, name) for name in os.listdir(RESULTS_DIR)
+        if name.endswith(".json") and os.path.join(RESULTS_DIR, name) != exclude
+    ]
+    return max(files, key=os.path.getmtime) if files else None
+
+
+def compare(results: List[BenchResult], baseline_path: str) -> List[str]:
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {r["name"]: r for r in json.load(f)["results"]}
+    lines = []
+    for result in results:
+        old = baseline.get(result.name)
+        if not old or not old["ops_per_sec"]:
+            continue
+        change = (result.ops_per_sec / old["ops_per_sec"] - 1) * 100
+        rt_change = result.round_trips - old["round_trips"]
+        flag = "  ⚠️ regression" if change < -10 or rt_change > 0 else ""
+        lines.append(f"{result.name:<32} {change:>+7.1f}% ops/s   {rt_change:>+6.1f} rt/op{flag}")
+    return lines
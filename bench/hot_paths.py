@@ -0,0 +1,231 @@
+# Microbenchmarks des chemins chauds de chaque cog, hors ligne (fakeredis + faux objets discord).
+# Usage (depuis la racine du repo) :
+#   pip install -r bench/requirements.txt
+#   python -m bench.hot_paths [--members 2000] [--iterations 200] [--label v1.2] [--only payout,monthly]
+# Les résultats sont écrits dans bench/results/<label>.json (label = commit courant par défaut)
+# et comparés au dernier fichier de résultats présent.
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.harness import compare, git_revision, latest_baseline, make_redis, measure, save_results  # noqa: E402
+from tools.fakes import FakeBot, FakeContext, FakeGuild, FakeInteraction, fake_message  # noqa: E402
+from utils.audit import AuditSink  # noqa: E402
+from utils.dm_dispatcher import DMDispatcher  # noqa: E402
+from utils.jobs import JobRunner  # noqa: E402
+from utils.leases import LeaseManager  # noqa: E402
+from utils.member_cache import RosterCache  # noqa: E402
+from utils.member_updates import MemberUpdateDispatcher  # noqa: E402
+from utils.mazoku_router import MazokuRouter  # noqa: E402
+from utils.sharding import ShardScheduler  # noqa: E402
+from utils.wallet import Wallet  # noqa: E402
+
+import cogs.autorole as autorole  # noqa: E402
+import cogs.cooldowns as cooldowns  # noqa: E402
+import cogs.dailyreminder as dailyreminder  # noqa: E402
+import cogs.lilac_shop as lilac_shop  # noqa: E402
+import cogs.petal_rewards as petal_rewards  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "mazoku_embeds.json")
+GUILD_ID = 1293611593845706793
+MAZOKU_BOT_ID = 1242388858897956906
+ADMIN_ID = 1
+
+
+def make_bot(guild: FakeGuild) -> FakeBot:
+    bot = FakeBot(redis=make_redis(), guilds=[guild])
+    bot.wallet = Wallet(bot)
+    bot.audit = AuditSink(bot)
+    bot.rosters = RosterCache(bot)
+    bot.shard_jobs = ShardScheduler(bot)
+    bot.leases = LeaseManager(bot)
+    bot.member_updates = MemberUpdateDispatcher(bot)
+    bot.jobs = JobRunner(bot)
+    return bot
+
+
+async def drain_jobs(bot: FakeBot):
+    # Les commandes admin lancent des jobs de fond : on mesure jusqu'à leur fin
+    await asyncio.gather(*list(bot.jobs.running.values()))
+
+
+def populate(guild: FakeGuild, members: int, role_ids, every: int = 1):
+    # Membre i : rôles dont l'index divise i (tous les membres ont le premier rôle)
+    for i in range(members):
+        guild.add_member(10_000 + i, [role_id for n, role_id in enumerate(role_ids) if i % (n * every + 1) == 0])
+    return guild
+
+
+# --- Scénarios ---
+async def bench_lilac_redeem(args):
+    guild = FakeGuild(GUILD_ID)
+    user = guild.add_member(ADMIN_ID)
+    bot = make_bot(guild)
+    await bot.wallet.credit(guild.id, user.id, petals=10 ** 12)
+    results = []
+    for item_id in ("normal_ticket", "ex_minah"):
+        async def op(i, item_id=item_id):
+            interaction = FakeInteraction(bot, guild, user)
+            await lilac_shop.RedeemButton(user.id, item_id).callback(interaction)
+        results.append(await measure(f"lilac_redeem[{item_id}]", op, args.iterations * 5))
+    return results
+
+
+async def bench_payout(args):
+    guild = populate(FakeGuild(GUILD_ID), args.members, [42])
+    bot = make_bot(guild)
+    cog = lilac_shop.LilacShop(bot)
+    await cog.cog_load()
+    ctx = FakeContext(bot, guild, guild.get_member(10_000))
+    role = guild.get_role(42)
+
+    async def op(i):
+        await cog.payout.callback(cog, ctx, role, 10)
+        await drain_jobs(bot)
+    return [await measure(f"payout[{args.members}]", op, args.iterations)]
+
+
+async def bench_monthly(args):
+    guild = populate(FakeGuild(GUILD_ID), args.members, petal_rewards.MONTHLY_ROLES)
+    guild.add_channel(petal_rewards.LOG_CHANNEL_ID)
+    bot = make_bot(guild)
+    cog = petal_rewards.PetalRewards(bot)
+    await cog.cog_load()
+    ctx = FakeContext(bot, guild, guild.get_member(10_000))
+
+    async def op(i):
+        await cog.monthly.callback(cog, ctx)
+        await drain_jobs(bot)
+    return [await measure(f"monthly[{args.members}]", op, args.iterations)]
+
+
+async def bench_retroactive(args):
+    guild = populate(FakeGuild(GUILD_ID), args.members, list(petal_rewards.ROLE_PETAL_REWARDS), every=2)
+    guild.add_channel(petal_rewards.LOG_CHANNEL_ID)
+    bot = make_bot(guild)
+    cog = petal_rewards.PetalRewards(bot)
+    await cog.cog_load()
+    ctx = FakeContext(bot, guild, guild.get_member(10_000))
+
+    async def op(i):
+        await cog.retroactive.callback(cog, ctx)
+        await drain_jobs(bot)
+    return [await measure(f"retroactive[{args.members}]", op, args.iterations)]
+
+
+async def bench_autorole(args):
+    # 1 membre sur 2 lvl10, 1 sur 5 banni, 1 sur 3 avec l'accès : ~N/3 changements par passe
+    guild = FakeGuild(GUILD_ID)
+    for role_id in (autorole.LVL10_ROLE_ID, autorole.CROSS_TRADE_ACCESS_ID, autorole.CROSS_TRADE_BAN_ID, autorole.MARKET_BAN_ID):
+        guild.add_role(role_id)
+    for i in range(args.members):
+        roles = {autorole.LVL10_ROLE_ID} if i % 2 == 0 else set()
+        if i % 5 == 0:
+            roles.add(autorole.CROSS_TRADE_BAN_ID)
+        if i % 3 == 0:
+            roles.add(autorole.CROSS_TRADE_ACCESS_ID)
+        guild.add_member(10_000 + i, roles)
+    admin = guild.add_member(ADMIN_ID)
+    initial = {member.id: set(member._roles) for member in guild.members}
+    channel = guild.add_channel(autorole.NOTIFY_CHANNEL_ID)
+    bot = make_bot(guild)
+    cog = autorole.AutoRole(bot)
+    await cog.cog_load()
+
+    async def setup(i):
+        for member in guild.members:
+            member._roles = set(initial[member.id])
+
+    async def op(i):
+        await cog.check_autorole_all.callback(cog, FakeInteraction(bot, guild, admin, channel))
+        await drain_jobs(bot)
+    return [await measure(f"check_autorole_all[{args.members}]", op, args.iterations, setup=setup)]
+
+
+async def bench_daily(args):
+    guild = populate(FakeGuild(dailyreminder.GUILD_ID), args.members, [1])
+    guild.add_channel(dailyreminder.LOG_CHANNEL_ID)
+    bot = make_bot(guild)
+    await bot.redis.sadd(dailyreminder.DAILY_KEY, *(str(member.id) for member in guild.members))
+    cog = dailyreminder.DailyReminder(bot)
+    cog.daily_task.cancel()
+    # Pas de pacing réel : on mesure le coût du dispatch, pas le rate limit Discord
+    cog.dispatcher = DMDispatcher(rate=1e9)
+
+    async def op(i):
+        await cog.run_daily(f"bench-{i}")
+    return [await measure(f"daily_task[{args.members}]", op, args.iterations)]
+
+
+async def bench_cooldowns(args):
+    with open(FIXTURES, encoding="utf-8") as f:
+        fixtures = json.load(f)
+    messages = [
+        fake_message({
+            "id": n, "guild_id": GUILD_ID, "channel_id": 1, "author_id": MAZOKU_BOT_ID,
+            "created_at": 0, "content": "", "embeds": [entry["embed"]],
+        })
+        for n, entry in enumerate(fixtures)
+    ]
+    bot = make_bot(FakeGuild(GUILD_ID))
+    bot.mazoku = MazokuRouter(bot, bot_id=MAZOKU_BOT_ID, guild_ids={GUILD_ID})
+    cog = cooldowns.Cooldowns(bot)
+    await cog.cog_load()
+
+    async def op(i):
+        await bot.mazoku.on_message(messages[i % len(messages)])
+    return [await measure("cooldowns_on_message", op, args.iterations * 50)]
+
+
+SCENARIOS = {
+    "lilac": bench_lilac_redeem,
+    "payout": bench_payout,
+    "monthly": bench_monthly,
+    "retroactive": bench_retroactive,
+    "autorole": bench_autorole,
+    "daily": bench_daily,
+    "cooldowns": bench_cooldowns,
+}
+
+
+async def run(args):
+    results = []
+    for name in args.only:
+        for result in await SCENARIOS[name](args):
+            print(result.row())
+            results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline hot-path benchmarks")
+    parser.add_argument("--members", type=int, default=2000)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--only", default=",".join(SCENARIOS), help=f"comma-separated subset of {', '.join(SCENARIOS)}")
+    parser.add_argument("--label", default=None, help="results file name (default: current commit)")
+    parser.add_argument("--baseline", default=None, help="results file to compare with (default: latest)")
+    args = parser.parse_args()
+    args.only = [name.strip() for name in args.only.split(",") if name.strip()]
+
+    # Les logs des cogs ne doivent pas polluer la sortie (leur coût reste mesuré)
+    logging.basicConfig(level=logging.INFO, stream=open(os.devnull, "w"))
+
+    results = asyncio.run(run(args))
+    label = args.label or git_revision()
+    path = save_results(results, label, {"members": args.members, "iterations": args.iterations})
+    print(f"\nSaved {path}")
+
+    baseline = args.baseline or latest_baseline(exclude=path)
+    if baseline:
+        print(f"Compared with {os.path.basename(baseline)}:")
+        for line in compare(results, baseline):
+            print("  " + line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# Benchmark du parser d'embeds Mazoku sur des embeds enregistrés (bench/fixtures).
+# Usage (depuis la racine du repo) : python -m bench.mazoku_parser [--iterations N]
+import argparse
+import json
+import os
+import re
+import sys
+import time
+import tracemalloc
+
+import discord
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.mazoku import RARITY_EMOTES, parse_embed  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "mazoku_embeds.json")
+
+# --- Ancienne implémentation (cogs/cooldowns.py), gardée comme référence ---
+LEGACY_EMOJI_REGEX = re.compile(r"<a?:\w+:(\d+)>")
+
+
+def legacy_parse(embed: discord.Embed):
+    title = (embed.title or "").lower()
+    found_rarity = None
+    if "auto summon" in title and "claimed" not in title:
+        text_to_scan = [embed.title or "", embed.description or ""]
+        if embed.fields:
+            for field in embed.fields:
+                text_to_scan.append(field.name or "")
+                text_to_scan.append(field.value or "")
+        if embed.footer and embed.footer.text:
+            text_to_scan.append(embed.footer.text)
+
+        for text in text_to_scan:
+            matches = LEGACY_EMOJI_REGEX.findall(text)
+            for emote_id in matches:
+                if emote_id in RARITY_EMOTES:
+                    found_rarity = RARITY_EMOTES[emote_id]
+                    break
+            if found_rarity:
+                break
+    return found_rarity
+
+
+def load_fixtures():
+    with open(FIXTURES, encoding="utf-8") as f:
+        return [(entry["name"], discord.Embed.from_dict(entry["embed"])) for entry in json.load(f)]
+
+
+def throughput(parse, embeds, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        for embed in embeds:
+            parse(embed)
+    return iterations * len(embeds) / (time.perf_counter() - started)
+
+
+def allocations(parse, embeds):
+    # Par message : pic mémoire pendant le parse et blocs encore alloués avec le résultat
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    for embed in embeds:
+        parse(embed)  # warm-up (caches internes de re, attributs paresseux)
+
+    tracemalloc.start()
+    try:
+        peak = 0
+        blocks = 0
+        for embed in embeds:
+            before = tracemalloc.take_snapshot().filter_traces(ignore)
+            tracemalloc.reset_peak()
+            current, _ = tracemalloc.get_traced_memory()
+            result = parse(embed)
+            peak += tracemalloc.get_traced_memory()[1] - current
+            after = tracemalloc.take_snapshot().filter_traces(ignore)
+            blocks += sum(max(0, stat.count_diff) for stat in after.compare_to(before, "lineno"))
+            del result
+        return peak / len(embeds), blocks / len(embeds)
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mazoku embed parser benchmark")
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    fixtures = load_fixtures()
+    embeds = [embed for _, embed in fixtures]
+
+    # Vérifie d'abord que le nouveau parser donne les mêmes raretés que l'ancien.
+    # Pic par fixture : l'ancien code ne scannait que les auto summons non réclamés, parse_embed
+    # résout la rareté de tous les embeds (le match regex coûte ~1,2 Ko transitoires, libérés au retour)
+    for name, embed in fixtures:
+        parsed = parse_embed(embed)
+        spawn_rarity = parsed.rarity if parsed.event == "auto_summon" and not parsed.claimed else None
+        legacy = legacy_parse(embed)
+        status = "ok" if spawn_rarity == legacy else "MISMATCH"
+        peak, legacy_peak = allocations(parse_embed, [embed])[0], allocations(legacy_parse, [embed])[0]
+        print(
+            f"{name:<26} event={parsed.event:<12} rarity={str(parsed.rarity):<5} claimed={parsed.claimed!s:<5} "
+            f"peak {peak:>6,.0f} B (legacy {legacy_peak:>6,.0f} B) [{status}]"
+        )
+
+    print()
+    print(f"{len(embeds)} fixtures x {args.iterations} iterations")
+    for label, parse in (("parse_embed", parse_embed), ("legacy", legacy_parse)):
+        rate = throughput(parse, embeds, args.iterations)
+        peak, blocks = allocations(parse, embeds)
+        print(f"{label:<12} {rate:>12,.0f} parses/sec   peak {peak:>7,.0f} B/message   {blocks:>5.1f} blocks/message")
+
+
+if __name__ == "__main__":
+    main()
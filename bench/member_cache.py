@@ -0,0 +1,108 @@
+# RSS du cache membres discord.py en mode full vs lean, pour un gros serveur synthétique.
+# Usage (depuis la racine du repo) :
+#   python -m bench.member_cache [--members 100000] [--active 0.02]
+# Chaque mode tourne dans un sous-processus (RSS mesuré via /proc/self/status, Linux uniquement) :
+#   full    : tous les membres en cache (chunk au démarrage)
+#   lean    : seuls les membres actifs en cache (vus via arrivées / updates)
+#   lean+job: lean après un job sur tout le serveur (chunk cache=False, index des rôles), liste relâchée
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+GUILD_ID = 1293611593845706793
+ROLE_IDS = [1_000 + n for n in range(40)]
+MODES = ("full", "lean", "lean+job")
+
+
+def rss_kib() -> int:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+def member_payload(i: int) -> dict:
+    # Payload GUILD_MEMBERS_CHUNK réaliste : user complet + quelques rôles
+    return {
+        "user": {"id": str(10 ** 17 + i), "username": f"member{i}", "global_name": f"Member {i}",
+                 "discriminator": "0", "avatar": "a" * 32 if i % 3 else None},
+        "roles": [str(role_id) for n, role_id in enumerate(ROLE_IDS) if i % (n + 2) == 0][:6],
+        "joined_at": "2024-05-01T12:00:00.000000+00:00",
+        "nick": f"nick{i}" if i % 4 == 0 else None,
+        "deaf": False, "mute": False, "flags": 0,
+    }
+
+
+def run_mode(mode: str, members: int, active: float) -> dict:
+    import discord
+
+    from utils.member_cache import Roster
+
+    lean = mode != "full"
+    intents = discord.Intents.default()
+    intents.members = True
+    flags = discord.MemberCacheFlags.none() if lean else discord.MemberCacheFlags.from_intents(intents)
+    flags.joined = True
+    client = discord.Client(intents=intents, member_cache_flags=flags, chunk_guilds_at_startup=not lean)
+    state = client._connection
+    guild = discord.Guild(data={
+        "id": str(GUILD_ID), "name": "bench", "member_count": members, "large": True,
+        "roles": [{"id": str(role_id), "name": f"role{role_id}", "position": n, "permissions": "0"}
+                  for n, role_id in enumerate([GUILD_ID] + ROLE_IDS)],
+    }, state=state)
+    state._add_guild(guild)
+
+    gc.collect()
+    before = rss_kib()
+
+    # full : le chunk de démarrage met tout le monde en cache ; lean : seulement les membres actifs
+    step = 1 if not lean else max(1, round(1 / active))
+    for i in range(0, members, step):
+        guild._add_member(discord.Member(data=member_payload(i), guild=guild, state=state))
+
+    if mode == "lean+job":
+        # Ce que fait RosterCache.get : chunk(cache=False) -> objets Member temporaires
+        roster = Roster(guild, [discord.Member(data=member_payload(i), guild=guild, state=state) for i in range(members)])
+        roster.with_role(ROLE_IDS[0])
+        roster.get(10 ** 17)
+        del roster
+
+    gc.collect()
+    return {"mode": mode, "cached": len(guild.members), "rss_kib": rss_kib() - before}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Member cache RSS: full vs lean")
+    parser.add_argument("--members", type=int, default=100_000)
+    parser.add_argument("--active", type=float, default=0.02, help="fraction of members seen in lean mode")
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args.members, args.active)))
+        return
+
+    results = []
+    for mode in MODES:
+        out = subprocess.run(
+            [sys.executable, "-m", "bench.member_cache", "--mode", mode,
+             "--members", str(args.members), "--active", str(args.active)],
+            capture_output=True, text=True, check=True,
+        )
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    full = results[0]["rss_kib"] or 1
+    print(f"{args.members:,} members, {args.active:.0%} active in lean mode")
+    for result in results:
+        print(f"{result['mode']:<10} {result['cached']:>9,} cached   {result['rss_kib'] / 1024:8.1f} MiB   "
+              f"{result['rss_kib'] / full:6.1%} of full")
+
+
+if __name__ == "__main__":
+    main()
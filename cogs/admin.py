@@ -1,14 +1,20 @@
+import io
 import logging
+import time
 import discord
 from discord import app_commands
 from discord.ext import commands
 
+from utils.profiler import LoopProfiler, format_report
+from utils.startup import record_sync
+
 log = logging.getLogger("cog-admin")
 
 
 class Admin(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        self.profiler = LoopProfiler()
 
     # --- Slash command /sync ---
     @app_commands.command(name="sync", description="Resynchroniser les commandes slash (guild + global)")
@@ -26,6 +32,7 @@ class Admin(commands.Cog):
             if scope is None:
                 synced_guild = await self.bot.tree.sync(guild=interaction.guild)
                 synced_global = await self.bot.tree.sync()
+                await record_sync(self.bot)
                 await interaction.followup.send(
                     f"✅ {len(synced_guild)} commandes resynchronisées sur **{interaction.guild.name}**\n"
                     f"🌍 {len(synced_global)} commandes globales resynchronisées.",
@@ -39,6 +46,7 @@ class Admin(commands.Cog):
                 )
             elif scope.value == "global":
                 synced = await self.bot.tree.sync()
+                await record_sync(self.bot)
                 await interaction.followup.send(
                     f"🌍 {len(synced)} commandes globales resynchronisées.",
                     ephemeral=True
@@ -56,6 +64,7 @@ class Admin(commands.Cog):
             await self.bot.tree.sync(guild=None)
 
             synced = await self.bot.tree.sync()
+            await record_sync(self.bot)
             await interaction.followup.send(
                 f"🧹 Purge terminée. 🌍 {len(synced)} commandes globales republisées depuis ton code.",
                 ephemeral=True
@@ -90,7 +99,56 @@ class Admin(commands.Cog):
             await self.bot.redis.set(key, "0")
             await interaction.response.send_message("⏸️ Summon reminders désactivés.", ephemeral=True)
 
+    # --- Slash command /wallet-migrate ---
+    @app_commands.command(name="wallet-migrate", description="Migrer les anciens soldes (petals:/tickets:) vers les wallets hash")
+    @app_commands.default_permissions(administrator=True)
+    async def wallet_migrate(self, interaction: discord.Interaction):
+        if not getattr(self.bot, "redis", None):
+            await interaction.response.send_message("⚠️ Redis n’est pas configuré.", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True)
+        try:
+            moved = await self.bot.wallet.migrate_legacy()
+            await interaction.followup.send(
+                "📦 Migration terminée : "
+                + ", ".join(f"{count} clés `{cur}`" for cur, count in moved.items()),
+                ephemeral=True
+            )
+        except Exception as e:
+            log.exception("❌ Wallet migration failed", exc_info=e)
+            await interaction.followup.send("❌ Erreur pendant la migration (relançable sans risque).", ephemeral=True)
+
+    # --- Slash command /profile ---
+    @app_commands.command(name="profile", description="Profiler la loop pendant N secondes (échantillonnage + callbacks lents)")
+    @app_commands.describe(seconds="Durée du profil (1-120 s)", threshold_ms="Seuil des callbacks lents en ms")
+    @app_commands.default_permissions(administrator=True)
+    async def profile(
+        self,
+        interaction: discord.Interaction,
+        seconds: app_commands.Range[int, 1, 120] = 10,
+        threshold_ms: app_commands.Range[int, 10, 10000] = 100,
+    ):
+        if self.profiler.running:
+            await interaction.response.send_message("⏳ Un profil est déjà en cours.", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        self.profiler.threshold = threshold_ms / 1000
+        log.info("🔬 Profiling for %ss (slow callback threshold %sms)", seconds, threshold_ms)
+        report = await self.profiler.profile(seconds)
+
+        summary = format_report(report)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        files = [discord.File(io.BytesIO(report.collapsed.encode()), filename=f"profile-{stamp}.collapsed.txt")]
+        if report.slow_callbacks:
+            stacks = "\n\n".join(
+                f"--- {slow.duration * 1000:.0f} ms ---\n{slow.stack}" for slow in report.slow_callbacks
+            )
+            files.append(discord.File(io.BytesIO(stacks.encode()), filename=f"slow-callbacks-{stamp}.txt"))
+        await interaction.followup.send(f"🔬 Profile terminé\n```\n{summary[:1800]}\n```", files=files, ephemeral=True)
+
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(Admin(bot), override=True)
-    log.info("⚙️ Admin cog loaded (sync, sync-clean, reminder)")
+    log.info("⚙️ Admin cog loaded (sync, sync-clean, reminder, wallet-migrate, profile)")
@@ -0,0 +1,80 @@
+import logging
+import discord
+from discord.ext import commands
+from discord import app_commands
+
+from utils.jobs import DONE, Job
+
+log = logging.getLogger("cog-jobs")
+
+
+class Jobs(commands.Cog):
+    # Suivi des jobs de fond de bot.jobs (payout, monthly, retroactive, autorole-scan)
+    job = app_commands.Group(
+        name="job",
+        description="Background admin jobs: status, cancel, resume",
+        default_permissions=discord.Permissions(administrator=True),
+        guild_only=True,
+    )
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+
+    async def find(self, interaction: discord.Interaction, job_id: str) -> Job:
+        if not self.bot.redis:
+            await interaction.response.send_message("⚠️ Redis is unavailable, try again in a moment.", ephemeral=True)
+            return None
+        job = await self.bot.jobs.get(job_id)
+        if job is None or job.guild_id != interaction.guild_id:
+            await interaction.response.send_message(f"❓ No job `{job_id}` in this server.", ephemeral=True)
+            return None
+        return job
+
+    # --- /job status ---
+    @job.command(name="status", description="Show a job, or the latest jobs of this server")
+    @app_commands.describe(job_id="Job id (empty = latest jobs)")
+    async def status(self, interaction: discord.Interaction, job_id: str = None):
+        if job_id:
+            job = await self.find(interaction, job_id)
+            if job:
+                text = job.describe() + f"\n⏱️ {job.timings()}" + (f"\n⚠️ {job.error}" if job.error else "")
+                await interaction.response.send_message(text, ephemeral=True)
+            return
+
+        if not self.bot.redis:
+            await interaction.response.send_message("⚠️ Redis is unavailable, try again in a moment.", ephemeral=True)
+            return
+        jobs = await self.bot.jobs.recent(interaction.guild_id)
+        if not jobs:
+            await interaction.response.send_message("📭 No jobs yet.", ephemeral=True)
+            return
+        await interaction.response.send_message("\n".join(job.describe() for job in jobs), ephemeral=True)
+
+    # --- /job cancel ---
+    @job.command(name="cancel", description="Stop a running job (members already processed stay processed)")
+    @app_commands.describe(job_id="Job id")
+    async def cancel(self, interaction: discord.Interaction, job_id: str):
+        job = await self.find(interaction, job_id)
+        if job:
+            job = await self.bot.jobs.cancel(job_id)
+            await interaction.response.send_message(f"🛑 {job.describe()}", ephemeral=True)
+            log.info("🛑 Job %s cancelled by %s", job_id, interaction.user)
+
+    # --- /job resume ---
+    @job.command(name="resume", description="Resume a cancelled, failed or interrupted job where it stopped")
+    @app_commands.describe(job_id="Job id")
+    async def resume(self, interaction: discord.Interaction, job_id: str):
+        job = await self.find(interaction, job_id)
+        if not job:
+            return
+        if job.status == DONE:
+            await interaction.response.send_message(f"✅ Already done: {job.describe()}", ephemeral=True)
+            return
+        job = await self.bot.jobs.resume(job_id)
+        await interaction.response.send_message(f"▶️ {job.describe()}", ephemeral=True)
+        log.info("▶️ Job %s resumed by %s", job_id, interaction.user)
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(Jobs(bot))
+    log.info("⚙️ Jobs cog loaded")
@@ -2,297 +2,323 @@ import discord
 from discord.ext import commands
 import logging
 
+from utils.jobs import DONE, ChunkResult, Job
+from utils.shop_catalog import EFFECT_CARD_PING, EFFECT_ROLE, EFFECT_TICKET, catalog
+from utils.wallet import LedgerEntry
+
 log = logging.getLogger("cog-lilac")
 
-SNORLAX_ROLE_ID = 1447310242911359109
-SNORLAX_PRICE = 50
-AUCTION_TICKET_PRICE = 10
-SKIP_QUEUE_TICKET_PRICE = 25
-CARD_EX_MINAH_PRICE = 20
-CARD_UR_RUMAN_PRICE = 35
-PING_USER_ID = 723441401211256842  # Ping on card purchase
+WALLET_FIELDS = (
+    ("🌸 Petals", "petals"),
+    ("🎟️ Auction Tickets", "tickets"),
+    ("🚀 Skip Queue Tickets", "skip_tickets"),
+)
+CURRENCY_EMOJIS = {currency: name.split(" ", 1)[0] for name, currency in WALLET_FIELDS}
+
+# --- Persistent shop components ---
+# Pas de View par shop ouvert : l'utilisateur et l'écran sont encodés dans le
+# custom_id, les classes ci-dessous sont enregistrées une seule fois
+# (add_dynamic_items) et les boutons survivent à un redémarrage.
+
+
+async def wallet_snapshot(interaction: discord.Interaction) -> dict:
+    # Un seul snapshot (1 aller-retour max) partagé par tous les écrans du shop
+    return await interaction.client.wallet.snapshot(interaction.guild_id, interaction.user.id)
+
+
+def add_wallet_fields(embed: discord.Embed, wallet: dict):
+    for index, (name, currency) in enumerate(WALLET_FIELDS):
+        embed.insert_field_at(index, name=name, value=f"`{wallet[currency]}`", inline=True)
+
+
+def render(template: dict, user: discord.abc.User, wallet: dict) -> discord.Embed:
+    # Embed précalculé par le catalogue : on ne patche que la miniature et le wallet
+    embed = discord.Embed.from_dict({**template, "fields": list(template["fields"])})
+    embed.set_thumbnail(url=user.display_avatar.url)
+    add_wallet_fields(embed, wallet)
+    return embed
+
+
+async def home_screen(interaction: discord.Interaction):
+    embed = render(catalog.home_embed, interaction.user, await wallet_snapshot(interaction))
+    view = discord.ui.View(timeout=None)
+    view.add_item(CategorySelect(interaction.user.id))
+    return embed, view
+
+
+async def category_screen(interaction: discord.Interaction, category: str):
+    embed = render(catalog.category_embeds[category], interaction.user, await wallet_snapshot(interaction))
+    view = discord.ui.View(timeout=None)
+    view.add_item(ItemSelect(interaction.user.id, category))
+    view.add_item(BackButton(interaction.user.id, "home"))
+    return embed, view
+
+
+# --- Wallet history (ledger Redis, une page = un XREVRANGE) ---
+def history_line(entry: LedgerEntry) -> str:
+    deltas = " ".join(f"{amount:+} {CURRENCY_EMOJIS[cur]}" for cur, amount in entry.deltas.items())
+    actor = f" by <@{entry.actor}>" if entry.actor else ""
+    return f"<t:{entry.timestamp}:f> **{deltas}** `{entry.reason or '?'}`{actor}"
+
+
+async def history_screen(wallet, guild_id: int, viewer_id: int, member_id: int, before: str = None):
+    entries, cursor = await wallet.history(guild_id, member_id, before)
+    lines = [history_line(entry) for entry in entries] or ["No wallet changes recorded yet."]
+    embed = discord.Embed(
+        title="📜 Wallet history",
+        description=f"<@{member_id}>, newest first\n\n" + "\n".join(lines),
+        color=discord.Color.purple()
+    )
+    view = discord.ui.View(timeout=None)
+    if before:
+        view.add_item(HistoryButton(viewer_id, member_id, "top"))
+    if cursor:
+        view.add_item(HistoryButton(viewer_id, member_id, cursor))
+    return embed, view
+
+
+# --- Redemption effects (un handler par type d'effet du catalogue) ---
+async def not_enough(interaction: discord.Interaction, item, result):
+    await interaction.response.send_message(
+        f"❌ Not enough petals. Need {item.price}, you have {result.of(interaction.user.id).get('petals', 0)}.",
+        ephemeral=True
+    )
+
+
+async def redeem_role(interaction: discord.Interaction, item) -> bool:
+    wallet = interaction.client.wallet
+    role = interaction.guild.get_role(item.target)
+    if role is None:
+        await interaction.response.send_message("❌ Role not found. Contact an admin.", ephemeral=True)
+        return False
+    if role in interaction.user.roles:
+        await interaction.response.send_message(f"❌ You already own {item.label}.", ephemeral=True)
+        return False
+    result = await wallet.debit(
+        interaction.guild_id, interaction.user.id, f"shop:{item.id}", interaction.user.id, petals=item.price
+    )
+    if not result.ok:
+        await not_enough(interaction, item, result)
+        return False
+    try:
+        await interaction.user.add_roles(role, reason=f"LilacShop purchase: {item.label}")
+    except discord.HTTPException:
+        await wallet.credit(interaction.guild_id, interaction.user.id, f"refund:{item.id}", petals=item.price)
+        log.exception("Failed to give %s to %s, refunded", item.label, interaction.user)
+        await interaction.response.send_message("❌ Could not give the role, petals refunded. Contact an admin.", ephemeral=True)
+        return False
+    await interaction.response.send_message(f"✅ Redeemed **{item.label}** for {item.price} petals!", ephemeral=True)
+    return True
+
+
+async def redeem_ticket(interaction: discord.Interaction, item) -> bool:
+    deltas = {"petals": -item.price, item.target: 1}
+    result = await interaction.client.wallet.apply(
+        interaction.guild_id, interaction.user.id, f"shop:{item.id}", interaction.user.id, **deltas
+    )
+    if not result.ok:
+        await not_enough(interaction, item, result)
+        return False
+    await interaction.response.send_message(f"✅ Redeemed **{item.label}** for {item.price} petals!", ephemeral=True)
+    return True
+
+
+async def redeem_card_ping(interaction: discord.Interaction, item) -> bool:
+    result = await interaction.client.wallet.debit(
+        interaction.guild_id, interaction.user.id, f"shop:{item.id}", interaction.user.id, petals=item.price
+    )
+    if not result.ok:
+        await not_enough(interaction, item, result)
+        return False
+    await interaction.response.send_message(f"✅ Redeemed **{item.label}** for {item.price} petals!", ephemeral=True)
+    await interaction.channel.send(
+        f"🃏 {interaction.user.mention} has just purchased **{item.label}** for {item.price} petals! <@{item.target}>"
+    )
+    return True
+
+
+REDEEM_EFFECTS = {
+    EFFECT_ROLE: redeem_role,
+    EFFECT_TICKET: redeem_ticket,
+    EFFECT_CARD_PING: redeem_card_ping,
+}
+
+
+class ShopComponent:
+    # interaction_check commun : seul le propriétaire du shop peut cliquer
+    user_id: int
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.user_id:
+            await interaction.response.send_message("❌ Not your shop.", ephemeral=True)
+            return False
+        return True
+
+
+class CategorySelect(ShopComponent, discord.ui.DynamicItem[discord.ui.Select], template=r"lilac:cat:(?P<user_id>\d+)"):
+    def __init__(self, user_id: int):
+        super().__init__(discord.ui.Select(
+            custom_id=f"lilac:cat:{user_id}",
+            placeholder="Choose a category", min_values=1, max_values=1, options=list(catalog.category_options)
+        ))
+        self.user_id = user_id
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Select, match):
+        return cls(int(match["user_id"]))
+
+    async def callback(self, interaction: discord.Interaction):
+        category = self.item.values[0]
+        if category not in catalog.categories:
+            embed, view = await home_screen(interaction)
+        else:
+            embed, view = await category_screen(interaction, category)
+        await interaction.response.edit_message(embed=embed, view=view)
+
+
+class ItemSelect(ShopComponent, discord.ui.DynamicItem[discord.ui.Select], template=r"lilac:item:(?P<user_id>\d+):(?P<category>\w+)"):
+    def __init__(self, user_id: int, category: str):
+        super().__init__(discord.ui.Select(
+            custom_id=f"lilac:item:{user_id}:{category}",
+            placeholder="Choose an item", min_values=1, max_values=1,
+            options=list(catalog.item_options.get(category, []))
+        ))
+        self.user_id = user_id
+        self.category = category
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Select, match):
+        return cls(int(match["user_id"]), match["category"])
+
+    async def callback(self, interaction: discord.Interaction):
+        item = catalog.get(self.item.values[0])
+        if item is None:
+            await interaction.response.send_message("❌ This item is no longer available.", ephemeral=True)
+            return
+        embed = render(catalog.item_embeds[item.id], interaction.user, await wallet_snapshot(interaction))
+
+        view = discord.ui.View(timeout=None)
+        view.add_item(RedeemButton(self.user_id, item.id))
+        view.add_item(BackButton(self.user_id, item.category))
+        await interaction.response.edit_message(embed=embed, view=view)
+
+
+class BackButton(ShopComponent, discord.ui.DynamicItem[discord.ui.Button], template=r"lilac:back:(?P<user_id>\d+):(?P<target>\w+)"):
+    # target = "home" (catégories) ou l'id d'une catégorie (liste d'items)
+    def __init__(self, user_id: int, target: str):
+        super().__init__(discord.ui.Button(
+            custom_id=f"lilac:back:{user_id}:{target}",
+            label="Back", style=discord.ButtonStyle.secondary, emoji="↩️"
+        ))
+        self.user_id = user_id
+        self.target = target
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        return cls(int(match["user_id"]), match["target"])
+
+    async def callback(self, interaction: discord.Interaction):
+        if self.target in catalog.categories:
+            embed, view = await category_screen(interaction, self.target)
+        else:
+            embed, view = await home_screen(interaction)
+        await interaction.response.edit_message(embed=embed, view=view)
+
+
+class RedeemButton(ShopComponent, discord.ui.DynamicItem[discord.ui.Button], template=r"lilac:redeem:(?P<user_id>\d+):(?P<item>\w+)"):
+    def __init__(self, user_id: int, item_id: str):
+        super().__init__(discord.ui.Button(
+            custom_id=f"lilac:redeem:{user_id}:{item_id}",
+            label="Redeem", style=discord.ButtonStyle.success, emoji="✅"
+        ))
+        self.user_id = user_id
+        self.item_id = item_id
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        return cls(int(match["user_id"]), match["item"])
+
+    async def callback(self, interaction: discord.Interaction):
+        item = catalog.get(self.item_id)
+        if item is None:
+            await interaction.response.send_message("❌ This item is no longer available.", ephemeral=True)
+            return
+        if not await REDEEM_EFFECTS[item.effect](interaction, item):
+            return
+
+        # Refresh embed status after purchase
+        status_embed = render(catalog.purchase_embed, interaction.user, await wallet_snapshot(interaction))
+        # Keep Back to items available after purchase
+        post_view = discord.ui.View(timeout=None)
+        post_view.add_item(BackButton(self.user_id, item.category))
+        await interaction.message.edit(embed=status_embed, view=post_view)
+
+
+class HistoryButton(
+    discord.ui.DynamicItem[discord.ui.Button],
+    template=r"lilac:hist:(?P<user_id>\d+):(?P<member_id>\d+):(?P<cursor>top|\d+-\d+)"
+):
+    # cursor = "top" (page la plus récente) ou id de la dernière entrée affichée (page suivante)
+    def __init__(self, user_id: int, member_id: int, cursor: str):
+        super().__init__(discord.ui.Button(
+            custom_id=f"lilac:hist:{user_id}:{member_id}:{cursor}",
+            label="Newest" if cursor == "top" else "Older",
+            style=discord.ButtonStyle.secondary, emoji="⏮️" if cursor == "top" else "▶️"
+        ))
+        self.user_id = user_id
+        self.member_id = member_id
+        self.cursor = cursor
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        return cls(int(match["user_id"]), int(match["member_id"]), match["cursor"])
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        # Seul celui qui a ouvert /history pagine (le droit de voir member_id a été vérifié à l'ouverture)
+        if interaction.user.id != self.user_id:
+            await interaction.response.send_message("❌ Not your history.", ephemeral=True)
+            return False
+        return True
+
+    async def callback(self, interaction: discord.Interaction):
+        before = None if self.cursor == "top" else self.cursor
+        embed, view = await history_screen(interaction.client.wallet, interaction.guild_id, self.user_id, self.member_id, before)
+        await interaction.response.edit_message(embed=embed, view=view)
+
+
+SHOP_ITEMS = (CategorySelect, ItemSelect, BackButton, RedeemButton, HistoryButton)
 
 
 class LilacShop(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
-    # --- Redis helpers ---
-    async def get_balance(self, user_id: int) -> int:
-        if not getattr(self.bot, "redis", None):
-            return 0
-        val = await self.bot.redis.get(f"petals:{user_id}")
-        return int(val or 0)
-
-    async def add_balance(self, user_id: int, amount: int):
-        if not getattr(self.bot, "redis", None):
-            return
-        current = await self.get_balance(user_id)
-        await self.bot.redis.set(f"petals:{user_id}", current + amount)
-
-    async def get_tickets(self, user_id: int) -> int:
-        if not getattr(self.bot, "redis", None):
-            return 0
-        val = await self.bot.redis.get(f"tickets:{user_id}")
-        return int(val or 0)
+    async def cog_load(self):
+        # Enregistré une fois : tous les shops ouverts (même avant un redeploy) restent cliquables
+        self.bot.add_dynamic_items(*SHOP_ITEMS)
+        self.bot.jobs.register("payout", self.apply_payout, self.finish_payout)
 
-    async def add_tickets(self, user_id: int, amount: int):
-        if not getattr(self.bot, "redis", None):
-            return
-        current = await self.get_tickets(user_id)
-        await self.bot.redis.set(f"tickets:{user_id}", current + amount)
+    async def cog_unload(self):
+        self.bot.remove_dynamic_items(*SHOP_ITEMS)
+        self.bot.jobs.unregister("payout")
 
-    # --- Command: /lilacshop (dynamic embed with Back navigation) ---
+    # --- Command: /lilacshop (persistent embed with Back navigation) ---
     @commands.hybrid_command(name="lilacshop", description="Open the dynamic Lilac shop")
+    @commands.guild_only()
     async def lilacshop(self, ctx: commands.Context):
-        petals = await self.get_balance(ctx.author.id)
-        tickets = await self.get_tickets(ctx.author.id)
+        wallet = await self.bot.wallet.snapshot(ctx.guild.id, ctx.author.id)
+        base_embed = render(catalog.home_embed, ctx.author, wallet)
 
-        base_embed = discord.Embed(
-            title="🌸 Lilac Shop",
-            description="Select a category from the dropdown below.",
-            color=discord.Color.purple()
-        )
-        base_embed.set_thumbnail(url=ctx.author.display_avatar.url)
-        base_embed.add_field(name="🌸 Petals", value=f"`{petals}`", inline=True)
-        base_embed.add_field(name="🎟️ Auction Tickets", value=f"`{tickets}`", inline=True)
-        base_embed.add_field(name="Categories", value="🌸 Discord Role\n🎟️ Auction Ticket\n🃏 Cards", inline=False)
-
-        categories = [
-            discord.SelectOption(label="Discord Role", description="Special server roles", emoji="🌸"),
-            discord.SelectOption(label="Auction Ticket", description="Bid in auctions", emoji="🎟️"),
-            discord.SelectOption(label="Cards", description="Collectible cards", emoji="🃏"),
-        ]
-        select_category = discord.ui.Select(placeholder="Choose a category", min_values=1, max_values=1, options=categories)
-
-        async def category_callback(interaction: discord.Interaction):
-            if interaction.user.id != ctx.author.id:
-                await interaction.response.send_message("❌ Not your shop.", ephemeral=True)
-                return
-
-            chosen = select_category.values[0]
-
-            # Live wallet
-            live_petals = await self.get_balance(ctx.author.id)
-            live_tickets = await self.get_tickets(ctx.author.id)
-
-            base_embed.clear_fields()
-            base_embed.add_field(name="🌸 Petals", value=f"`{live_petals}`", inline=True)
-            base_embed.add_field(name="🎟️ Auction Tickets", value=f"`{live_tickets}`", inline=True)
-
-            # Category items + descriptions
-            if chosen == "Discord Role":
-                items_text = (
-                    f"🌸 Snorlax — {SNORLAX_PRICE} petals\n"
-                    f"*Special server role with cozy vibes.*"
-                )
-                item_options = [
-                    discord.SelectOption(label="Snorlax", description=f"{SNORLAX_PRICE} petals", emoji="🌸"),
-                ]
-            elif chosen == "Auction Ticket":
-                items_text = (
-                    f"🎟️ Normal Queue Auction Ticket — {AUCTION_TICKET_PRICE} petals\n"
-                    f"*Join the standard auction queue.*\n\n"
-                    f"🚀 Skip Queue Auction Ticket — {SKIP_QUEUE_TICKET_PRICE} petals\n"
-                    f"*Jump ahead in the auction queue for priority bidding.*"
-                )
-                item_options = [
-                    discord.SelectOption(label="Normal Queue Auction Ticket", description=f"{AUCTION_TICKET_PRICE} petals", emoji="🎟️"),
-                    discord.SelectOption(label="Skip Queue Auction Ticket", description=f"{SKIP_QUEUE_TICKET_PRICE} petals", emoji="🚀"),
-                ]
-            else:  # Cards
-                items_text = (
-                    f"✨ EX Minah vCM — {CARD_EX_MINAH_PRICE} petals\n"
-                    f"*Exclusive collectible card.*\n\n"
-                    f"💎 UR Ruman AFK vCM — {CARD_UR_RUMAN_PRICE} petals\n"
-                    f"*Ultra rare collectible card.*"
-                )
-                item_options = [
-                    discord.SelectOption(label="EX Minah vCM", description=f"{CARD_EX_MINAH_PRICE} petals", emoji="✨"),
-                    discord.SelectOption(label="UR Ruman AFK vCM", description=f"{CARD_UR_RUMAN_PRICE} petals", emoji="💎"),
-                ]
-
-            base_embed.add_field(name="Items", value=items_text, inline=False)
-
-            # Back to categories button
-            back_to_categories = discord.ui.Button(label="Back", style=discord.ButtonStyle.secondary, emoji="↩️")
-
-            async def back_categories_callback(inter2: discord.Interaction):
-                if inter2.user.id != ctx.author.id:
-                    await inter2.response.send_message("❌ Not your shop.", ephemeral=True)
-                    return
-
-                # Refresh base view
-                reset_embed = discord.Embed(
-                    title="🌸 Lilac Shop",
-                    description="Select a category from the dropdown below.",
-                    color=discord.Color.purple()
-                )
-                reset_embed.set_thumbnail(url=ctx.author.display_avatar.url)
-                reset_embed.add_field(name="🌸 Petals", value=f"`{await self.get_balance(ctx.author.id)}`", inline=True)
-                reset_embed.add_field(name="🎟️ Auction Tickets", value=f"`{await self.get_tickets(ctx.author.id)}`", inline=True)
-                reset_embed.add_field(name="Categories", value="🌸 Discord Role\n🎟️ Auction Ticket\n🃏 Cards", inline=False)
-
-                base_view = discord.ui.View(timeout=180)
-                select_category.callback = category_callback
-                base_view.add_item(select_category)
-                await inter2.response.edit_message(embed=reset_embed, view=base_view)
-
-            # Items dropdown
-            select_item = discord.ui.Select(placeholder="Choose an item", min_values=1, max_values=1, options=item_options)
-
-            async def item_callback(interaction2: discord.Interaction):
-                if interaction2.user.id != ctx.author.id:
-                    await interaction2.response.send_message("❌ Not your shop.", ephemeral=True)
-                    return
-
-                chosen_item = select_item.values[0]
-
-                # Keep an "items" state snapshot to go back to
-                embed_items = discord.Embed(
-                    title="🌸 Lilac Shop",
-                    description=f"{chosen} — items",
-                    color=discord.Color.purple()
-                )
-                embed_items.set_thumbnail(url=ctx.author.display_avatar.url)
-                embed_items.add_field(name="🌸 Petals", value=f"`{await self.get_balance(ctx.author.id)}`", inline=True)
-                embed_items.add_field(name="🎟️ Auction Tickets", value=f"`{await self.get_tickets(ctx.author.id)}`", inline=True)
-                embed_items.add_field(name="Items", value=items_text, inline=False)
-
-                view_items = discord.ui.View(timeout=180)
-                select_item.callback = item_callback
-                view_items.add_item(select_item)
-                # Back button at items level
-                back_to_categories.callback = back_categories_callback
-                view_items.add_item(back_to_categories)
-
-                # Now show selected item screen
-                base_embed.clear_fields()
-                base_embed.add_field(name="🌸 Petals", value=f"`{await self.get_balance(ctx.author.id)}`", inline=True)
-                base_embed.add_field(name="🎟️ Auction Tickets", value=f"`{await self.get_tickets(ctx.author.id)}`", inline=True)
-                base_embed.add_field(name="Selected item", value=f"✅ {chosen_item}", inline=False)
-
-                redeem_btn = discord.ui.Button(label="Redeem", style=discord.ButtonStyle.success, emoji="✅")
-                back_to_items = discord.ui.Button(label="Back", style=discord.ButtonStyle.secondary, emoji="↩️")
-
-                async def redeem_callback(interaction3: discord.Interaction):
-                    if interaction3.user.id != ctx.author.id:
-                        await interaction3.response.send_message("❌ Not your shop.", ephemeral=True)
-                        return
-
-                    petals_local = await self.get_balance(interaction3.user.id)
-
-                    if chosen_item == "Snorlax":
-                        price = SNORLAX_PRICE
-                        role = ctx.guild.get_role(SNORLAX_ROLE_ID)
-                        if role is None:
-                            await interaction3.response.send_message("❌ Role not found. Contact an admin.", ephemeral=True)
-                            return
-                        if role in interaction3.user.roles:
-                            await interaction3.response.send_message("❌ You already own Snorlax.", ephemeral=True)
-                            return
-                        if petals_local < price:
-                            await interaction3.response.send_message(f"❌ Not enough petals. Need {price}, you have {petals_local}.", ephemeral=True)
-                            return
-                        await self.add_balance(interaction3.user.id, -price)
-                        await interaction3.user.add_roles(role, reason="LilacShop purchase: Snorlax")
-                        await interaction3.response.send_message(f"✅ Redeemed **Snorlax** for {price} petals!", ephemeral=True)
-
-                    elif chosen_item == "Normal Queue Auction Ticket":
-                        price = AUCTION_TICKET_PRICE
-                        if petals_local < price:
-                            await interaction3.response.send_message(f"❌ Not enough petals. Need {price}, you have {petals_local}.", ephemeral=True)
-                            return
-                        await self.add_balance(interaction3.user.id, -price)
-                        await self.add_tickets(interaction3.user.id, 1)
-                        await interaction3.response.send_message(f"✅ Redeemed **Normal Queue Auction Ticket** for {price} petals!", ephemeral=True)
-
-                    elif chosen_item == "Skip Queue Auction Ticket":
-                        price = SKIP_QUEUE_TICKET_PRICE
-                        if petals_local < price:
-                            await interaction3.response.send_message(f"❌ Not enough petals. Need {price}, you have {petals_local}.", ephemeral=True)
-                            return
-                        await self.add_balance(interaction3.user.id, -price)
-                        await self.add_tickets(interaction3.user.id, 1)
-                        await interaction3.response.send_message(f"✅ Redeemed **Skip Queue Auction Ticket** for {price} petals!", ephemeral=True)
-
-                    elif chosen_item == "EX Minah vCM":
-                        price = CARD_EX_MINAH_PRICE
-                        if petals_local < price:
-                            await interaction3.response.send_message(f"❌ Not enough petals. Need {price}, you have {petals_local}.", ephemeral=True)
-                            return
-                        await self.add_balance(interaction3.user.id, -price)
-                        await interaction3.response.send_message(f"✅ Redeemed **EX Minah vCM** for {price} petals!", ephemeral=True)
-                        await ctx.channel.send(
-                            f"🃏 {interaction3.user.mention} has just purchased **EX Minah vCM** for {price} petals! <@{PING_USER_ID}>"
-                        )
-
-                    elif chosen_item == "UR Ruman AFK vCM":
-                        price = CARD_UR_RUMAN_PRICE
-                        if petals_local < price:
-                            await interaction3.response.send_message(f"❌ Not enough petals. Need {price}, you have {petals_local}.", ephemeral=True)
-                            return
-                        await self.add_balance(interaction3.user.id, -price)
-                        await interaction3.response.send_message(f"✅ Redeemed **UR Ruman AFK vCM** for {price} petals!", ephemeral=True)
-                        await ctx.channel.send(
-                            f"🃏 {interaction3.user.mention} has just purchased **UR Ruman AFK vCM** for {price} petals! <@{PING_USER_ID}>"
-                        )
-
-                    # Refresh embed status after purchase
-                    refreshed_petals = await self.get_balance(ctx.author.id)
-                    refreshed_tickets = await self.get_tickets(ctx.author.id)
-                    status_embed = discord.Embed(
-                        title="🌸 Lilac Shop",
-                        description="Purchase complete ✅",
-                        color=discord.Color.green()
-                    )
-                    status_embed.set_thumbnail(url=ctx.author.display_avatar.url)
-                    status_embed.add_field(name="🌸 Petals", value=f"`{refreshed_petals}`", inline=True)
-                    status_embed.add_field(name="🎟️ Auction Tickets", value=f"`{refreshed_tickets}`", inline=True)
-                    status_embed.add_field(name="Tip", value="Use Back to continue shopping.", inline=False)
-                    # Keep Back to items available after purchase
-                    post_view = discord.ui.View(timeout=180)
-                    back_to_items.callback = back_items_callback
-                    post_view.add_item(back_to_items)
-                    await interaction3.message.edit(embed=status_embed, view=post_view)
-
-                async def back_items_callback(interaction3: discord.Interaction):
-                    if interaction3.user.id != ctx.author.id:
-                        await interaction3.response.send_message("❌ Not your shop.", ephemeral=True)
-                        return
-                    # Return to the items list view for current category
-                    await interaction3.response.edit_message(embed=embed_items, view=view_items)
-
-                redeem_btn.callback = redeem_callback
-                back_to_items.callback = back_items_callback
-
-                selected_view = discord.ui.View(timeout=180)
-                selected_view.add_item(redeem_btn)
-                selected_view.add_item(back_to_items)
-
-                await interaction2.response.edit_message(embed=base_embed, view=selected_view)
-
-            select_item.callback = item_callback
-
-            # View for items + Back to categories
-            items_view = discord.ui.View(timeout=180)
-            items_view.add_item(select_item)
-            back_to_categories.callback = back_categories_callback
-            items_view.add_item(back_to_categories)
-
-            await interaction.response.edit_message(embed=base_embed, view=items_view)
-
-        select_category.callback = category_callback
-        base_view = discord.ui.View(timeout=180)
-        base_view.add_item(select_category)
+        base_view = discord.ui.View(timeout=None)
+        base_view.add_item(CategorySelect(ctx.author.id))
         await ctx.send(embed=base_embed, view=base_view)
 
     # --- Command: /balance ---
     @commands.hybrid_command(name="balance", description="Check your Lilac wallet")
+    @commands.guild_only()
     async def balance(self, ctx: commands.Context, member: discord.Member = None):
         member = member or ctx.author
-        petals = await self.get_balance(member.id)
-        tickets = await self.get_tickets(member.id)
+        wallet = await self.bot.wallet.get_all(ctx.guild.id, member.id)
 
         embed = discord.Embed(
             title=f"Minah : Wallet of {member.display_name}",
@@ -300,25 +326,47 @@ class LilacShop(commands.Cog):
             color=discord.Color.purple()
         )
         embed.set_thumbnail(url=member.display_avatar.url)
-        embed.add_field(name="🌸 Petals", value=f"`{petals}`", inline=True)
-        embed.add_field(name="🎟️ Auction Tickets", value=f"`{tickets}`", inline=True)
+        add_wallet_fields(embed, wallet)
         embed.set_footer(text="Use /lilacshop to open the shop")
         await ctx.send(embed=embed)
 
+    # --- Command: /history ---
+    @commands.hybrid_command(name="history", description="Browse the petal / ticket changes of your wallet (admins: any member)")
+    @commands.guild_only()
+    async def history(self, ctx: commands.Context, member: discord.Member = None):
+        member = member or ctx.author
+        # Le ledger d'un autre membre (raisons, auteurs des mouvements) est réservé aux admins
+        if member.id != ctx.author.id and not ctx.author.guild_permissions.administrator:
+            await ctx.send("⛔ Only admins can view another member's history.", ephemeral=True)
+            return
+        embed, view = await history_screen(self.bot.wallet, ctx.guild.id, ctx.author.id, member.id)
+        await ctx.send(embed=embed, view=view)
+
     # --- Admin: /payout ---
     @commands.hybrid_command(name="payout", description="Admin: distribute petals to all members with a role")
     @commands.has_permissions(administrator=True)
     async def payout(self, ctx: commands.Context, role: discord.Role, amount: int):
-        count = 0
-        for member in role.members:
-            await self.add_balance(member.id, amount)
-            count += 1
+        # Job de fond reprenable (bot.jobs) : un redémarrage en plein payout ne recrédite personne
+        roster = await self.bot.rosters.get(ctx.guild)
+        targets = [(member.id, {"petals": amount}) for member in roster.with_role(role.id)]
+        params = {"amount": amount, "role": role.name}
+        await ctx.send(await self.bot.jobs.launch("payout", ctx.guild, ctx.channel, ctx.author.id, targets, params))
+
+    async def apply_payout(self, job: Job, guild: discord.Guild, entries) -> ChunkResult:
+        credited = await self.bot.wallet.credit_once(guild.id, job.applied_key, entries, f"payout:{job.id}", job.created_by)
+        return ChunkResult(credited, 0)
+
+    async def finish_payout(self, job: Job, guild: discord.Guild):
+        channel = guild.get_channel(job.channel_id)
+        if job.status != DONE or not channel:
+            return
         embed = discord.Embed(
             title="🌸 Payout Successful",
-            description=f"Gave **{amount} petals** to **{count} members** with role `{role.name}`.",
+            description=f"Gave **{job.params['amount']} petals** to **{job.applied} members** with role `{job.params['role']}`.",
             color=discord.Color.green()
         )
-        await ctx.send(embed=embed)
+        embed.set_footer(text=f"Job {job.id} · {job.timings()}")
+        await channel.send(embed=embed)
 
 
 async def setup(bot: commands.Bot):
@@ -1,47 +1,51 @@
 import os
 import logging
-import discord
 from discord.ext import commands
 
+from utils.mazoku_router import MazokuMessage
+
 log = logging.getLogger("cog-log")
 
-GUILD_ID = int(os.getenv("GUILD_ID", "0"))
-MAZOKU_BOT_ID = int(os.getenv("MAZOKU_BOT_ID", "0"))
+# INFO : une ligne par message/edit ; DEBUG : tous les embeds ; WARNING : silencieux
+MAZOKU_LOG_LEVEL = os.getenv("MAZOKU_LOG_LEVEL", "INFO").upper()
+log.setLevel(MAZOKU_LOG_LEVEL)
 
 class MazokuLog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        log.info("⚙️ MazokuLog loaded (GUILD_ID=%s, MAZOKU_BOT_ID=%s)", GUILD_ID, MAZOKU_BOT_ID)
 
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        if message.author.id != MAZOKU_BOT_ID:
+    async def cog_load(self):
+        # Même config serveurs / bot que les autres features Mazoku (bot.mazoku)
+        # Serveur GUILD_ID uniquement (comme avant le routeur)
+        guild_ids = self.bot.mazoku.scope("GUILD_ID")
+        self.bot.mazoku.subscribe(self.on_mazoku_message, messages=True, edits=True, guild_ids=guild_ids)
+        log.info(
+            "⚙️ MazokuLog loaded (guilds=%s, MAZOKU_BOT_ID=%s)",
+            sorted(guild_ids if guild_ids is not None else self.bot.mazoku.guild_ids), self.bot.mazoku.bot_id
+        )
+
+    async def cog_unload(self):
+        self.bot.mazoku.unsubscribe(self.on_mazoku_message)
+
+    async def on_mazoku_message(self, event: MazokuMessage):
+        # Un seul record structuré par message (un enqueue), rien à construire si le niveau est filtré
+        if not log.isEnabledFor(logging.INFO):
             return
-        if not message.guild or message.guild.id != GUILD_ID:
+        message = event.message
+        if event.edited and event.embed is None:
             return
 
-        log.info("📩 Mazoku message (ID=%s): %s", message.id, message.content)
-        if message.embeds:
-            for i, e in enumerate(message.embeds):
-                log.info("Embed %s:", i)
-                log.info("  Title: %s", e.title)
-                log.info("  Desc: %s", e.description)
-                log.info("  Footer: %s", e.footer.text if e.footer else "")
-
-    @commands.Cog.listener()
-    async def on_message_edit(self, before: discord.Message, after: discord.Message):
-        if after.author.id != MAZOKU_BOT_ID:
-            return
-        if not after.guild or after.guild.id != GUILD_ID:
-            return
-        if not after.embeds:
+        fields = {"message_id": message.id, "guild_id": message.guild.id, "channel_id": message.channel.id}
+        if event.embed is not None:
+            fields.update(event=event.embed.event, rarity=event.embed.rarity, claimed=event.embed.claimed)
+            fields.update(title=event.embed.title, description=event.embed.description, footer=event.embed.footer)
+        if event.edited:
+            log.info("✏️ Mazoku message edited (ID=%s)", message.id, extra=fields)
             return
 
-        embed = after.embeds[0]
-        log.info("✏️ Mazoku message edited (ID=%s)", after.id)
-        log.info("  Title: %s", embed.title)
-        log.info("  Desc: %s", embed.description)
-        log.info("  Footer: %s", embed.footer.text if embed.footer else "")
+        if log.isEnabledFor(logging.DEBUG):
+            fields["embeds"] = [e.to_dict() for e in message.embeds]
+        log.info("📩 Mazoku message (ID=%s): %s", message.id, message.content, extra=fields)
 
 # --- Extension setup ---
 async def setup(bot: commands.Bot):
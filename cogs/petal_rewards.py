@@ -2,6 +2,9 @@ import discord
 from discord.ext import commands
 import logging
 
+from utils.jobs import DONE, ChunkResult, Job
+from utils.member_updates import RoleChange
+
 log = logging.getLogger("cog-petal-rewards")
 
 ROLE_PETAL_REWARDS = {
@@ -24,92 +27,125 @@ class PetalRewards(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
-    # --- Redis helpers ---
-    async def get_balance(self, user_id: int) -> int:
-        if not getattr(self.bot, "redis", None):
-            return 0
-        val = await self.bot.redis.get(f"petals:{user_id}")
-        return int(val or 0)
-
-    async def add_balance(self, user_id: int, amount: int):
-        if not getattr(self.bot, "redis", None):
+    async def cog_load(self):
+        self.bot.member_updates.subscribe(self.on_role_change)
+        self.bot.jobs.register("monthly", self.apply_monthly, self.finish_monthly)
+        self.bot.jobs.register("retroactive", self.apply_retroactive, self.finish_retroactive)
+
+    async def cog_unload(self):
+        self.bot.member_updates.unsubscribe(self.on_role_change)
+        self.bot.jobs.unregister("monthly")
+        self.bot.jobs.unregister("retroactive")
+
+    def log_action(self, guild: discord.Guild, message: str):
+        # Bufferisé par bot.audit : les lignes sont regroupées en messages de ~2000 caractères
+        self.bot.audit.post(guild.get_channel(LOG_CHANNEL_ID), message)
+
+    # --- Event: attribution de rôle (rafales regroupées par bot.member_updates) ---
+    async def on_role_change(self, change: RoleChange):
+        if change.partial:
+            # Mode lean : rôles d'avant inconnus, impossible de savoir lesquels sont nouveaux
+            log.debug("Skipping petal rewards for uncached member %s", change.member)
+            return
+        after = change.member
+        roles = [
+            role for role in (after.guild.get_role(role_id) for role_id in change.added if role_id in ROLE_PETAL_REWARDS)
+            if role
+        ]
+        if not roles:
             return
-        current = await self.get_balance(user_id)
-        await self.bot.redis.set(f"petals:{user_id}", current + amount)
 
-    async def get_tickets(self, user_id: int) -> int:
-        if not getattr(self.bot, "redis", None):
-            return 0
-        val = await self.bot.redis.get(f"tickets:{user_id}")
-        return int(val or 0)
+        # Un seul crédit pour tous les rôles obtenus dans la rafale
+        reward = sum(ROLE_PETAL_REWARDS[role.id] for role in roles)
+        await self.bot.wallet.credit(after.guild.id, after.id, "role-reward", petals=reward)
 
-    async def add_tickets(self, user_id: int, amount: int):
-        if not getattr(self.bot, "redis", None):
-            return
-        current = await self.get_tickets(user_id)
-        await self.bot.redis.set(f"tickets:{user_id}", current + amount)
-
-    async def log_action(self, guild: discord.Guild, message: str):
-        channel = guild.get_channel(LOG_CHANNEL_ID)
-        if channel:
-            await channel.send(message)
-
-    # --- Event: attribution de rôle ---
-    @commands.Cog.listener()
-    async def on_member_update(self, before: discord.Member, after: discord.Member):
-        new_roles = [r for r in after.roles if r not in before.roles]
-        for role in new_roles:
-            if role.id in ROLE_PETAL_REWARDS:
-                reward = ROLE_PETAL_REWARDS[role.id]
-                await self.add_balance(after.id, reward)
-                try:
-                    await after.send(f"🌸 You received **{reward} petals** for obtaining the role `{role.name}`!")
-                except discord.Forbidden:
-                    log.info(f"Could not DM {after} for petal reward.")
-                await self.log_action(after.guild, f"🌸 {after.mention} received **{reward} petals** for role `{role.name}`")
+        names = ", ".join(f"`{role.name}`" for role in roles)
+        label = "role" if len(roles) == 1 else "roles"
+        try:
+            await after.send(f"🌸 You received **{reward} petals** for obtaining the {label} {names}!")
+        except discord.Forbidden:
+            log.info(f"Could not DM {after} for petal reward.")
+        self.log_action(after.guild, f"🌸 {after.mention} received **{reward} petals** for {label} {names}")
 
     # --- Commande: /monthly ---
+    # Jobs de fond reprenables (bot.jobs) : un membre déjà crédité n'est jamais recrédité
     @commands.hybrid_command(name="monthly", description="Distribute monthly rewards to specific roles")
     @commands.has_permissions(administrator=True)
     async def monthly(self, ctx: commands.Context):
-        count = 0
+        totals = {}
+        roster = await self.bot.rosters.get(ctx.guild)
         for role_id in MONTHLY_ROLES:
-            role = ctx.guild.get_role(role_id)
-            if not role:
+            if not ctx.guild.get_role(role_id):
                 continue
-            for member in role.members:
-                await self.add_balance(member.id, MONTHLY_PETALS)
-                await self.add_tickets(member.id, MONTHLY_SKIP_TICKET)
-                count += 1
-                await self.log_action(ctx.guild, f"🌸 {member.mention} received {MONTHLY_PETALS} petals and {MONTHLY_SKIP_TICKET} Skip Queue Ticket (monthly)")
-
+            for member in roster.with_role(role_id):
+                # Un membre présent dans plusieurs rôles cumule les récompenses
+                wallet = totals.setdefault(member.id, {"petals": 0, "skip_tickets": 0})
+                wallet["petals"] += MONTHLY_PETALS
+                wallet["skip_tickets"] += MONTHLY_SKIP_TICKET
+
+        await ctx.send(await self.bot.jobs.launch("monthly", ctx.guild, ctx.channel, ctx.author.id, totals.items()))
+
+    async def apply_monthly(self, job: Job, guild: discord.Guild, entries) -> ChunkResult:
+        credited = await self.bot.wallet.credit_once(guild.id, job.applied_key, entries, f"monthly:{job.id}", job.created_by)
+        rewards = dict(entries)
+        for member_id in credited:
+            reward = rewards[member_id]
+            self.log_action(guild, f"🌸 <@{member_id}> received {reward['petals']} petals and {reward['skip_tickets']} Skip Queue Ticket (monthly)")
+        return ChunkResult(credited, 0)
+
+    async def finish_monthly(self, job: Job, guild: discord.Guild):
+        await self.bot.audit.flush(guild.get_channel(LOG_CHANNEL_ID))
+        channel = guild.get_channel(job.channel_id)
+        if job.status != DONE or not channel:
+            return
         embed = discord.Embed(
             title="🌸 Monthly Rewards",
-            description=f"Distributed rewards to **{count} members** in monthly roles.",
+            description=f"Distributed rewards to **{job.applied} members** in monthly roles.",
             color=discord.Color.green()
         )
-        await ctx.send(embed=embed)
+        embed.set_footer(text=f"Job {job.id} · {job.timings()}")
+        await channel.send(embed=embed)
 
     # --- Commande: /retroactive ---
     @commands.hybrid_command(name="retroactive", description="Grant petal rewards to members who already have the roles")
     @commands.has_permissions(administrator=True)
     async def retroactive(self, ctx: commands.Context):
-        count = 0
+        totals = {}
+        roster = await self.bot.rosters.get(ctx.guild)
         for role_id, reward in ROLE_PETAL_REWARDS.items():
-            role = ctx.guild.get_role(role_id)
-            if not role:
+            if not ctx.guild.get_role(role_id):
                 continue
-            for member in role.members:
-                await self.add_balance(member.id, reward)
-                count += 1
-                await self.log_action(ctx.guild, f"🌸 {member.mention} retroactively received **{reward} petals** for role `{role.name}`")
+            for member in roster.with_role(role_id):
+                entry = totals.setdefault(member.id, {"petals": 0, "roles": []})
+                entry["petals"] += reward
+                entry["roles"].append(role_id)
+
+        await ctx.send(await self.bot.jobs.launch("retroactive", ctx.guild, ctx.channel, ctx.author.id, totals.items()))
 
+    async def apply_retroactive(self, job: Job, guild: discord.Guild, entries) -> ChunkResult:
+        credited = await self.bot.wallet.credit_once(
+            guild.id, job.applied_key, [(member_id, {"petals": entry["petals"]}) for member_id, entry in entries],
+            f"retroactive:{job.id}", job.created_by,
+        )
+        rewards = dict(entries)
+        for member_id in credited:
+            entry = rewards[member_id]
+            names = ", ".join(f"`{role.name}`" for role in map(guild.get_role, entry["roles"]) if role)
+            self.log_action(guild, f"🌸 <@{member_id}> retroactively received **{entry['petals']} petals** for {names}")
+        return ChunkResult(credited, 0)
+
+    async def finish_retroactive(self, job: Job, guild: discord.Guild):
+        await self.bot.audit.flush(guild.get_channel(LOG_CHANNEL_ID))
+        channel = guild.get_channel(job.channel_id)
+        if job.status != DONE or not channel:
+            return
         embed = discord.Embed(
             title="🌸 Retroactive Rewards",
-            description=f"Granted role-based petal rewards to **{count} members** who already had the roles.",
+            description=f"Granted role-based petal rewards to **{job.applied} members** who already had the roles.",
             color=discord.Color.green()
         )
-        await ctx.send(embed=embed)
+        embed.set_footer(text=f"Job {job.id} · {job.timings()}")
+        await channel.send(embed=embed)
 
 
 async def setup(bot: commands.Bot):
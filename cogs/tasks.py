@@ -12,16 +12,34 @@ STATUSES = [
     discord.Activity(type=discord.ActivityType.listening, name="to K-Pop 🎵"),
 ]
 
+STATUS_LEASE = "presence"
+
+
 class Tasks(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self._status_task = None
         self._heartbeat_task = None
 
+    async def cog_unload(self):
+        await self.bot.leases.stop_singleton(STATUS_LEASE)
+        self.stop_status()
+        if self._heartbeat_task:
+            self._heartbeat_task.cancel()
+
+    def start_status(self):
+        if not self._status_task or self._status_task.done():
+            self._status_task = asyncio.create_task(self.cycle_status())
+
+    def stop_status(self):
+        if self._status_task:
+            self._status_task.cancel()
+            self._status_task = None
+
     @commands.Cog.listener()
     async def on_ready(self):
-        if not self._status_task:
-            self._status_task = asyncio.create_task(self.cycle_status())
+        # Statut tournant : une seule réplique à la fois (lease Redis)
+        self.bot.leases.singleton(STATUS_LEASE, self.start_status, self.stop_status)
         if not self._heartbeat_task:
             self._heartbeat_task = asyncio.create_task(self.heartbeat())
         log.info("✅ Background tasks launched")
@@ -36,7 +54,20 @@ class Tasks(commands.Cog):
 
     async def heartbeat(self):
         while True:
-            log.info("💓 Heartbeat: bot alive")
+            manager = getattr(self.bot, "redis_manager", None)
+            metrics = getattr(self.bot, "metrics", None)
+            shards = getattr(self.bot, "shard_monitor", None)
+            log.info(
+                "💓 Heartbeat: bot alive | redis %s | metrics %s",
+                manager.stats() if manager else None,
+                metrics.summary() if metrics else None,
+            )
+            if shards:
+                for row in shards.report():
+                    log.info(
+                        "🧩 Shard %(shard)s: %(latency_ms)s ms, %(events_per_s)s events/s, %(guilds)s guilds, "
+                        "jobs %(jobs_running)s running / %(jobs_queued)s queued", row, extra=row
+                    )
             await asyncio.sleep(60)
 
 async def setup(bot: commands.Bot):
@@ -1,17 +1,25 @@
 # main.py
 import os
 import logging
-import asyncio
-import glob
 import discord
-from discord.ext import commands
-import redis.asyncio as redis
+
+from utils.audit import AuditSink
+from utils.jobs import JobRunner
+from utils.leases import LeaseManager
+from utils.logging_pipeline import setup_logging
+from utils.mazoku_capture import start_capture
+from utils.mazoku_router import MazokuRouter
+from utils.member_cache import RosterCache, bot_options, install_uncached_member_updates, is_lean
+from utils.member_updates import MemberUpdateDispatcher
+from utils.metrics import Metrics
+from utils.redis_manager import RedisManager
+from utils.sharding import ShardMonitor, ShardScheduler, bot_class, is_sharded, shard_options
+from utils.startup import StartupTimer, load_cogs, sync_if_changed
+from utils.wallet import Wallet
 
 # --- Logging ---
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s"
-)
+# Handler non bloquant (queue) sur la loop, écriture JSON sur un thread dédié
+setup_logging()
 log = logging.getLogger("main")
 
 # --- Token, Redis, Prefix ---
@@ -27,55 +35,114 @@ intents.members = True
 intents.messages = True
 
 # --- Bot ---
-bot = commands.Bot(
+# SHARD_MODE=auto : AutoShardedBot (SHARD_COUNT / SHARD_IDS optionnels)
+bot = bot_class()(
     command_prefix=COMMAND_PREFIX,
     intents=intents,
-    case_insensitive=True
+    case_insensitive=True,
+    # MEMBER_CACHE_MODE=lean : cache membres réduit, pas de chunk au démarrage
+    **bot_options(intents),
+    **shard_options()
 )
 
 # --- Setup hook ---
+startup = StartupTimer()
+
+
 async def setup_hook():
-    # Connexion Redis partagée pour tous les cogs
-    try:
-        bot.redis = redis.from_url(REDIS_URL, decode_responses=True)
-        await bot.redis.ping()
-        log.info("✅ Connected to Redis at %s", REDIS_URL)
-    except Exception as e:
-        bot.redis = None
-        log.error("❌ Redis connection failed: %s", e)
-
-    # --- Auto‑load de tous les cogs dans /cogs ---
-    cog_files = glob.glob("cogs/*.py")
-    results = []
-
-    for file in cog_files:
-        cog_name = file.replace("/", ".").replace("\\", ".")[:-3]  # ex: cogs.admin
-        try:
-            await bot.load_extension(cog_name)
-            results.append((cog_name, "✅"))
-        except Exception as e:
-            results.append((cog_name, f"❌ ({type(e).__name__})"))
-            log.exception("❌ Failed to load cog %s", cog_name, exc_info=e)
+    # Métriques (latences commandes / listeners / Redis / API Discord), endpoint si METRICS_PORT
+    bot.metrics = Metrics(bot)
+    bot.metrics.install()
+    await bot.metrics.start()
+
+    # Pool Redis unique partagé par tous les cogs (bot.redis = None tant que Redis ne répond pas,
+    # le health check le rétablit automatiquement)
+    bot.redis = None
+    bot.redis_manager = RedisManager(bot, REDIS_URL)
+    with startup.phase("redis connect"):
+        if not await bot.redis_manager.connect():
+            log.error("❌ Redis connection failed, retrying in background")
+
+    # Leases Redis : jobs singletons (rappels, statut) et verrous des commandes de masse,
+    # pour pouvoir lancer plusieurs répliques du bot
+    bot.leases = LeaseManager(bot)
+    bot.leases.install()
+
+    # Portefeuille partagé (petals / tickets) pour LilacShop et PetalRewards
+    bot.wallet = Wallet(bot)
+
+    # Salons de log (récompenses, AutoRole, résumé des rappels) : lignes regroupées en messages de ~2000 caractères
+    bot.audit = AuditSink(bot)
+
+    # Listener on_member_update unique (diff des rôles + regroupement des rafales)
+    bot.member_updates = MemberUpdateDispatcher(bot)
+
+    # Liste complète des membres pour les jobs (AutoRole, payouts, rappels), à la demande en mode lean
+    bot.rosters = RosterCache(bot)
+    if is_lean():
+        install_uncached_member_updates(bot)
+
+    # Jobs par serveur planifiés par shard + latence / events par shard (heartbeat, /metrics)
+    bot.shard_jobs = ShardScheduler(bot)
+    bot.shard_monitor = ShardMonitor(bot)
+    bot.shard_monitor.install()
+
+    # Jobs admin de masse en tâche de fond, reprenables après crash (/job status|cancel|resume)
+    bot.jobs = JobRunner(bot)
+
+    # Routeur Mazoku : filtre et parse chaque message Mazoku une seule fois
+    bot.mazoku = MazokuRouter(bot)
+    # Capture optionnelle du trafic Mazoku (MAZOKU_CAPTURE_PATH) pour tools/replay_mazoku.py
+    bot.mazoku_capture = start_capture(bot.mazoku)
+
+    # --- Auto‑load de tous les cogs dans /cogs (en parallèle) ---
+    results = await load_cogs(bot, startup)
 
     # --- Affichage tableau clair ---
     log.info("📦 Cogs loading summary:")
     for name, status in results:
         log.info("   %s %s", status, name)
 
-    # 🔑 Sync global une seule fois au démarrage (slash commands)
-    try:
-        synced = await bot.tree.sync()
-        log.info("🌍 Global slash commands synced (%s commandes)", len(synced))
-    except Exception as e:
-        log.exception("❌ Failed to sync global slash commands:", exc_info=e)
+    # 🔑 Sync global seulement si l'arbre de commandes a changé depuis le dernier sync
+    with startup.phase("command sync"):
+        try:
+            await sync_if_changed(bot)
+        except Exception as e:
+            log.exception("❌ Failed to sync global slash commands:", exc_info=e)
 
 bot.setup_hook = setup_hook
 
+_close = bot.close
+
+
+async def close():
+    # Envoie les lignes de log encore en buffer tant que la connexion est ouverte
+    audit = getattr(bot, "audit", None)
+    if audit:
+        await audit.close()
+    # Libère les leases tout de suite : une autre réplique reprend sans attendre LEASE_TTL
+    leases = getattr(bot, "leases", None)
+    if leases:
+        await leases.close()
+    await _close()
+    # Puis le pool Redis (et son health check) et l'endpoint /metrics, une fois les cogs déchargés
+    redis_manager = getattr(bot, "redis_manager", None)
+    if redis_manager:
+        await redis_manager.close()
+    metrics = getattr(bot, "metrics", None)
+    if metrics:
+        await metrics.close()
+
+bot.close = close
+
 # --- Events ---
 @bot.event
 async def on_ready():
+    startup.ready()
     log.info("🤖 Bot connecté en tant que %s (ID: %s)", bot.user, bot.user.id)
     log.info("🌍 Connecté sur %s serveurs", len(bot.guilds))
+    if is_sharded():
+        log.info("🧩 Shards actifs: %s / %s", sorted(bot.shards), bot.shard_count)
     log.info("⌨️ Prefix actif: %s (slash toujours disponible)", COMMAND_PREFIX)
 
 # --- Run ---
@@ -83,4 +150,5 @@ if __name__ == "__main__":
     if not TOKEN:
         log.error("❌ DISCORD_TOKEN manquant dans les variables d'environnement")
     else:
-        bot.run(TOKEN)
+        # log_handler=None : les logs discord.py passent par le même pipeline
+        bot.run(TOKEN, log_handler=None)
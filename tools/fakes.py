@@ -0,0 +1,202 @@
+# Objets Discord minimaux pour rejouer du trafic hors ligne (tools/, bench/)
+import itertools
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import discord
+
+
+class FakeBot:
+    # Juste ce que les routeurs / cogs utilisent : listeners, user, redis, wallet...
+    def __init__(self, **attrs):
+        self.listeners = {}
+        self.user = SimpleNamespace(id=0, name="replay")
+        self.redis = None
+        self.guilds = []
+        # état des buckets de rate limit lu par RoleMutationScheduler (vide = pas d'attente)
+        self.http = SimpleNamespace(_bucket_hashes={}, _buckets={})
+        for name, value in attrs.items():
+            setattr(self, name, value)
+
+    def add_listener(self, func, name=None):
+        self.listeners.setdefault(name or func.__name__, []).append(func)
+
+    def get_guild(self, guild_id: int):
+        return next((guild for guild in self.guilds if guild.id == guild_id), None)
+
+    def add_dynamic_items(self, *items):
+        pass
+
+    def remove_dynamic_items(self, *items):
+        pass
+
+    def remove_listener(self, func, name=None):
+        listeners = self.listeners.get(name or func.__name__, [])
+        if func in listeners:
+            listeners.remove(func)
+
+
+def fake_guild(guild_id: int):
+    return SimpleNamespace(id=guild_id, name=f"guild-{guild_id}")
+
+
+def fake_message(record: dict, guilds: dict = None):
+    # record = ligne de capture (utils/mazoku_capture.serialize)
+    guilds = guilds if guilds is not None else {}
+    guild = guilds.setdefault(record["guild_id"], fake_guild(record["guild_id"]))
+    edited_at = record.get("edited_at")
+    return SimpleNamespace(
+        id=record["id"],
+        guild=guild,
+        channel=SimpleNamespace(id=record["channel_id"], guild=guild),
+        author=SimpleNamespace(id=record["author_id"], bot=True),
+        content=record.get("content") or "",
+        embeds=[discord.Embed.from_dict(data) for data in record.get("embeds", ())],
+        created_at=datetime.fromtimestamp(record["created_at"], timezone.utc),
+        edited_at=datetime.fromtimestamp(edited_at, timezone.utc) if edited_at else None,
+    )
+
+
+# --- Serveur / membres / rôles (bench) ---
+class FakeAsset:
+    def __init__(self, url: str):
+        self.url = url
+
+
+class FakeMessage:
+    _ids = itertools.count(1)
+
+    def __init__(self, channel=None, content=None, **kwargs):
+        self.id = next(FakeMessage._ids)
+        self.channel = channel
+        self.content = content
+        self.kwargs = kwargs
+
+    async def edit(self, **kwargs):
+        self.kwargs.update(kwargs)
+        return self
+
+
+class FakeChannel:
+    def __init__(self, channel_id: int, guild=None):
+        self.id = channel_id
+        self.guild = guild
+        self.sent = 0
+
+    async def send(self, content=None, **kwargs):
+        self.sent += 1
+        return FakeMessage(self, content, **kwargs)
+
+
+class FakeRole:
+    def __init__(self, role_id: int, guild, name: str = None):
+        self.id = role_id
+        self.guild = guild
+        self.name = name or f"role-{role_id}"
+        self.mention = f"<@&{role_id}>"
+
+    @property
+    def members(self):
+        # Même coût que discord.py : un passage sur tous les membres du serveur
+        return [member for member in self.guild.members if self.id in member._roles]
+
+
+class FakeMember:
+    def __init__(self, member_id: int, guild, role_ids=()):
+        self.id = member_id
+        self.guild = guild
+        self._roles = set(role_ids)
+        self.bot = False
+        self.name = self.display_name = f"member-{member_id}"
+        self.mention = f"<@{member_id}>"
+        self.display_avatar = FakeAsset(f"https://cdn.example/avatars/{member_id}.png")
+        self.dms = 0
+
+    @property
+    def roles(self):
+        return [role for role in map(self.guild.get_role, self._roles) if role]
+
+    def get_role(self, role_id: int):
+        return self.guild.get_role(role_id) if role_id in self._roles else None
+
+    async def add_roles(self, *roles, reason=None):
+        self._roles.update(role.id for role in roles)
+
+    async def remove_roles(self, *roles, reason=None):
+        self._roles.difference_update(role.id for role in roles)
+
+    async def send(self, content=None, **kwargs):
+        self.dms += 1
+        return FakeMessage(None, content, **kwargs)
+
+
+class FakeGuild:
+    def __init__(self, guild_id: int, name: str = None):
+        self.id = guild_id
+        self.name = name or f"guild-{guild_id}"
+        self._roles = {}
+        self._members = {}
+        self._channels = {}
+        self.chunked = True
+
+    @property
+    def members(self):
+        return list(self._members.values())
+
+    def add_role(self, role_id: int, name: str = None) -> FakeRole:
+        return self._roles.setdefault(role_id, FakeRole(role_id, self, name))
+
+    def add_member(self, member_id: int, role_ids=()) -> FakeMember:
+        for role_id in role_ids:
+            self.add_role(role_id)
+        member = self._members[member_id] = FakeMember(member_id, self, role_ids)
+        return member
+
+    def add_channel(self, channel_id: int) -> FakeChannel:
+        return self._channels.setdefault(channel_id, FakeChannel(channel_id, self))
+
+    def get_role(self, role_id: int):
+        return self._roles.get(role_id)
+
+    def get_member(self, member_id: int):
+        return self._members.get(member_id)
+
+    def get_channel(self, channel_id: int):
+        return self._channels.get(channel_id)
+
+
+class FakeResponse:
+    def __init__(self):
+        self.calls = 0
+
+    async def send_message(self, content=None, **kwargs):
+        self.calls += 1
+
+    async def edit_message(self, **kwargs):
+        self.calls += 1
+
+    async def defer(self, **kwargs):
+        self.calls += 1
+
+
+class FakeInteraction:
+    def __init__(self, client, guild: FakeGuild, user: FakeMember, channel: FakeChannel = None):
+        self.client = client
+        self.guild = guild
+        self.guild_id = guild.id
+        self.user = user
+        self.channel = channel or FakeChannel(0, guild)
+        self.message = FakeMessage(self.channel)
+        self.response = FakeResponse()
+        self.followup = FakeChannel(0, guild)
+
+
+class FakeContext:
+    def __init__(self, bot, guild: FakeGuild, author: FakeMember, channel: FakeChannel = None):
+        self.bot = bot
+        self.guild = guild
+        self.author = author
+        self.channel = channel or FakeChannel(0, guild)
+
+    async def send(self, content=None, **kwargs):
+        return await self.channel.send(content, **kwargs)
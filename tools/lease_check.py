@@ -0,0 +1,186 @@
+# Vérifie les leases Redis avec plusieurs "répliques" dans un même process, contre un Redis local.
+# Usage (depuis la racine du repo) :
+#   REDIS_URL=redis://localhost:6379 python -m tools.lease_check [--replicas 3] [--ttl 2]
+#   python -m tools.lease_check --fake      # sans serveur (fakeredis[lua], voir bench/requirements.txt)
+# Scénarios :
+#   1. un seul leader pour un job singleton ; reprise après crash du leader (lease non libéré)
+#   2. reprise immédiate après un arrêt propre (lease libéré)
+#   3. verrou de job : deux exécutions concurrentes du même job -> une seule passe
+#   4. commande préfixe reçue par toutes les répliques -> exécutée une seule fois
+#   5. verrou perdu (repris par une autre réplique) -> le job qui le détenait est arrêté
+#   6. coupure Redis courte -> le leader garde son job ; plus longue -> il s'arrête avant l'expiration du lease
+import argparse
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.leases import LEASE_KEY, LeaseHeld, LeaseManager  # noqa: E402
+
+JOB = "lease-check"
+
+
+def make_client(args):
+    if args.fake:
+        import fakeredis
+        return fakeredis.FakeAsyncRedis(decode_responses=True)
+    import redis.asyncio as redis
+    return redis.Redis.from_url(args.redis_url, decode_responses=True)
+
+
+class Replica:
+    def __init__(self, name: str, client, ttl: float):
+        self.name = name
+        self.bot = SimpleNamespace(redis=client)
+        self.leases = LeaseManager(self.bot, owner=name, ttl=ttl)
+        self.running = False
+
+    def start(self):
+        self.running = True
+
+    def stop(self):
+        self.running = False
+
+
+def leaders(replicas):
+    return [r.name for r in replicas if r.running]
+
+
+async def wait_for_leader(replicas, timeout: float):
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        current = leaders(replicas)
+        if current:
+            return current, time.perf_counter() - started
+        await asyncio.sleep(0.01)
+    return [], timeout
+
+
+def check(ok: bool, label: str):
+    print(f"{'✅' if ok else '❌'} {label}")
+    return ok
+
+
+async def run(args):
+    client = make_client(args)
+    await client.delete(LEASE_KEY.format(name=JOB), LEASE_KEY.format(name="job:monthly:1"))
+    replicas = [Replica(f"replica-{n}", client, args.ttl) for n in range(args.replicas)]
+    results = []
+
+    # 1. Élection puis crash du leader (tâche tuée, lease laissé dans Redis)
+    for replica in replicas:
+        replica.leases.singleton(JOB, replica.start, replica.stop)
+    await wait_for_leader(replicas, args.ttl)
+    await asyncio.sleep(args.ttl)
+    results.append(check(len(leaders(replicas)) == 1, f"single leader after {args.ttl:.0f}s: {leaders(replicas)}"))
+
+    crashed = next(r for r in replicas if r.running)
+    crashed.bot.redis = None  # crash : plus de renouvellement ni de libération
+    crashed.leases._singletons.pop(JOB).cancel()
+    await asyncio.sleep(0)
+    crashed.running = False
+    survivors = [r for r in replicas if r is not crashed]
+    new, took = await wait_for_leader(survivors, args.ttl * 3)
+    results.append(check(
+        len(new) == 1 and took <= args.ttl * 4 / 3 + 0.2,
+        f"takeover after crash of {crashed.name} by {new} in {took:.2f}s (bound {args.ttl * 4 / 3:.2f}s)",
+    ))
+
+    # 2. Arrêt propre : lease libéré, reprise au prochain essai (<= TTL / 3)
+    leader = next(r for r in survivors if r.running)
+    await leader.leases.close()
+    rest = [r for r in survivors if r is not leader]
+    if rest:
+        new, took = await wait_for_leader(rest, args.ttl * 3)
+        results.append(check(
+            len(new) == 1 and took <= args.ttl / 3 + 0.2,
+            f"takeover after clean stop of {leader.name} by {new} in {took:.2f}s (bound {args.ttl / 3:.2f}s)",
+        ))
+    for replica in survivors:
+        await replica.leases.close()
+
+    # 3. Verrou de job : deux /monthly en même temps sur deux répliques
+    runs = []
+
+    async def monthly(replica):
+        try:
+            async with replica.leases.lock("job:monthly:1"):
+                runs.append(replica.name)
+                await asyncio.sleep(args.ttl)  # plus long que TTL / 3 : le verrou doit être renouvelé
+        except LeaseHeld as e:
+            return e.holder
+
+    held = await asyncio.gather(*(monthly(r) for r in survivors))
+    results.append(check(len(runs) == 1, f"job lock: ran on {runs}, refused on {len([h for h in held if h])} replicas"))
+    results.append(check(await client.get(LEASE_KEY.format(name="job:monthly:1")) is None, "job lock released"))
+
+    # 4. Commande préfixe reçue par chaque réplique
+    message_id = time.time_ns()
+    claims = await asyncio.gather(*(r.leases.claim_message(message_id) for r in survivors))
+    results.append(check(sum(claims) == 1, f"prefix command claimed {sum(claims)} time(s)"))
+
+    # 5. Verrou repris par une autre réplique pendant le job (ex : pause GC / réseau > TTL)
+    first, second = survivors[0], survivors[-1]
+    lock_name = "job:payout:1"
+    await client.delete(LEASE_KEY.format(name=lock_name))
+    stopped = asyncio.Event()
+
+    async def long_job():
+        try:
+            async with first.leases.lock(lock_name):
+                await client.set(LEASE_KEY.format(name=lock_name), second.name)  # volé
+                await asyncio.sleep(args.ttl * 3)
+        except asyncio.CancelledError:
+            stopped.set()
+
+    started = time.perf_counter()
+    await asyncio.gather(long_job(), return_exceptions=True)
+    took = time.perf_counter() - started
+    results.append(check(
+        stopped.is_set() and took <= args.ttl / 3 + 0.2,
+        f"job stopped {took:.2f}s after losing its lock (bound {args.ttl / 3:.2f}s)",
+    ))
+    results.append(check(
+        await client.get(LEASE_KEY.format(name=lock_name)) == second.name, "new holder's lock left untouched"
+    ))
+
+    # 6. Coupure Redis chez le leader (RedisManager remet bot.redis à None le temps de reconnecter)
+    outage = Replica("replica-outage", client, args.ttl)
+    await client.delete(LEASE_KEY.format(name="lease-check-outage"))
+    outage.leases.singleton("lease-check-outage", outage.start, outage.stop)
+    await wait_for_leader([outage], args.ttl)
+    outage.bot.redis = None
+    await asyncio.sleep(args.ttl / 2)
+    outage.bot.redis = client
+    await asyncio.sleep(args.ttl / 3)
+    results.append(check(outage.running, f"leader kept its job through a {args.ttl / 2:.2f}s Redis outage"))
+    outage.bot.redis = None
+    started = time.perf_counter()
+    while outage.running and time.perf_counter() - started < args.ttl * 3:
+        await asyncio.sleep(0.01)
+    took = time.perf_counter() - started
+    results.append(check(
+        not outage.running and took < args.ttl,
+        f"leader stepped down {took:.2f}s into a longer outage, before its lease expired ({args.ttl:.2f}s)",
+    ))
+    await outage.leases.close()
+
+    await client.aclose()
+    return all(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Redis lease checks across simulated replicas")
+    parser.add_argument("--replicas", type=int, default=3)
+    parser.add_argument("--ttl", type=float, default=2.0)
+    parser.add_argument("--redis-url", default=os.getenv("REDIS_URL", "redis://localhost:6379"))
+    parser.add_argument("--fake", action="store_true", help="use fakeredis instead of a local server")
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(run(args)) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# Vérifie l'instrumentation de bot.metrics sur un vrai bot discord.py, sans connexion.
+# Usage (depuis la racine du repo) :
+#   python -m tools.metrics_check
+# Scénarios :
+#   1. un payload gateway parsé (chemin de la websocket : _connection.parsers) est compté
+#   2. Metrics et ShardMonitor comptent tous les deux (les deux wrappers de parsers cohabitent)
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import discord  # noqa: E402
+from discord.ext import commands  # noqa: E402
+
+from utils.metrics import Metrics  # noqa: E402
+from utils.sharding import ShardMonitor  # noqa: E402
+
+MEMBER_UPDATE = {
+    "guild_id": "1",
+    "user": {"id": "2", "username": "check", "discriminator": "0", "avatar": None},
+    "roles": [],
+}
+
+
+def check(ok: bool, label: str):
+    print(f"{'✅' if ok else '❌'} {label}")
+    return ok
+
+
+def counted(metrics: Metrics, event: str) -> int:
+    return int(metrics.gateway_events.values.get((event,), 0))
+
+
+async def run():
+    bot = commands.Bot(command_prefix="!", intents=discord.Intents.default())
+    metrics = Metrics(bot)
+    metrics.install()
+    monitor = ShardMonitor(bot)
+    monitor.install()
+    results = []
+
+    # Même appel que DiscordWebSocket.received_message pour un event GUILD_MEMBER_UPDATE
+    before = counted(metrics, "GUILD_MEMBER_UPDATE")
+    bot._connection.parsers["GUILD_MEMBER_UPDATE"](MEMBER_UPDATE)
+    results.append(check(
+        counted(metrics, "GUILD_MEMBER_UPDATE") == before + 1,
+        f"gateway GUILD_MEMBER_UPDATE counted: {counted(metrics, 'GUILD_MEMBER_UPDATE')}",
+    ))
+
+    bot._connection.parsers["TYPING_START"]({"channel_id": "3", "user_id": "2", "timestamp": 0})
+    results.append(check(counted(metrics, "TYPING_START") == 1, "gateway TYPING_START counted"))
+    results.append(check(sum(monitor.events.values()) == 2, f"shard monitor still counts: {monitor.events}"))
+
+    await bot.close()
+    return all(results)
+
+
+def main():
+    sys.exit(0 if asyncio.run(run()) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# Rejoue une capture Mazoku (MAZOKU_CAPTURE_PATH) à travers le routeur et les cogs abonnés.
+# Usage (depuis la racine du repo) :
+#   python -m tools.replay_mazoku captures/mazoku.jsonl            # vitesse max
+#   python -m tools.replay_mazoku captures/mazoku.jsonl --speed 1  # temps réel
+import argparse
+import asyncio
+import importlib
+import json
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.fakes import FakeBot, fake_message  # noqa: E402
+from utils.mazoku_router import MazokuRouter  # noqa: E402
+
+# module -> classe du cog (abonnés au routeur)
+COGS = {
+    "cooldowns": ("cogs.cooldowns", "Cooldowns"),
+    "log": ("cogs.log", "MazokuLog"),
+}
+
+
+def capture_files(path: str):
+    # Fichiers tournés (path.N ... path.1) puis le courant : ordre chronologique
+    rotated = []
+    index = 1
+    while os.path.exists(f"{path}.{index}"):
+        rotated.append(f"{path}.{index}")
+        index += 1
+    return list(reversed(rotated)) + ([path] if os.path.exists(path) else [])
+
+
+def load_records(path: str):
+    records = []
+    for file in capture_files(path):
+        with open(file, encoding="utf-8") as f:
+            records.extend(json.loads(line) for line in f if line.strip())
+    return records
+
+
+def timestamp(record: dict) -> float:
+    return record["edited_at"] if record["kind"] == "edit" and record.get("edited_at") else record["created_at"]
+
+
+async def replay(records, cogs, speed: float):
+    guilds = {}
+    events = [(record, fake_message(record, guilds)) for record in records]
+    bot = FakeBot(redis=object())  # les cogs ne font que vérifier que Redis est "disponible"
+    author_ids = {record["author_id"] for record in records}
+    router = MazokuRouter(bot, bot_id=next(iter(author_ids)) if author_ids else 0, guild_ids=set(guilds))
+    bot.mazoku = router
+
+    loaded = []
+    for name in cogs:
+        module, cls = COGS[name]
+        cog = getattr(importlib.import_module(module), cls)(bot)
+        await cog.cog_load()
+        loaded.append(cog)
+
+    # Parse seul (sans handlers)
+    started = time.perf_counter()
+    for _, message in events:
+        router.classify(message)
+    parse_time = time.perf_counter() - started
+
+    previous = {}
+    first = timestamp(events[0][0]) if events else 0.0
+    started = time.perf_counter()
+    for record, message in events:
+        if speed > 0:
+            delay = (timestamp(record) - first) / speed - (time.perf_counter() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        if record["kind"] == "edit":
+            await router.on_message_edit(previous.get(message.id), message)
+        else:
+            await router.on_message(message)
+        previous[message.id] = message
+    total_time = time.perf_counter() - started
+
+    for cog in loaded:
+        await cog.cog_unload()
+    return parse_time, total_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a Mazoku capture offline")
+    parser.add_argument("capture", help="capture file (rotated .N files are included)")
+    parser.add_argument("--speed", type=float, default=0.0, help="1 = real time, 0 = max speed (default)")
+    parser.add_argument("--cogs", default=",".join(COGS), help=f"comma-separated subset of {', '.join(COGS)}")
+    parser.add_argument("--verbose", action="store_true", help="print the cogs' logs to stderr")
+    args = parser.parse_args()
+
+    # Sans --verbose les logs partent dans /dev/null : leur coût reste mesuré
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr if args.verbose else open(os.devnull, "w"))
+    records = load_records(args.capture)
+    if not records:
+        print(f"No records found in {args.capture}")
+        return
+    cogs = [name.strip() for name in args.cogs.split(",") if name.strip()]
+
+    parse_time, total_time = asyncio.run(replay(records, cogs, args.speed))
+    edits = sum(1 for record in records if record["kind"] == "edit")
+    print(f"{len(records)} events ({edits} edits) through {', '.join(cogs)}")
+    print(f"parse only  {len(records) / parse_time:>12,.0f} events/sec")
+    print(f"end to end  {len(records) / total_time:>12,.0f} events/sec ({total_time:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import os
+from typing import Dict, List, Optional
+
+import discord
+
+log = logging.getLogger("audit")
+
+# --- Config ---
+# Les lignes d'un salon sont envoyées au plus tard AUDIT_FLUSH_INTERVAL s après la première,
+# ou dès qu'elles remplissent un message
+AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", "2"))
+MESSAGE_LIMIT = 2000  # caractères max d'un message Discord
+
+
+def pack(lines: List[str], limit: int = MESSAGE_LIMIT) -> List[str]:
+    # Regroupe les lignes (dans l'ordre) en messages d'au plus limit caractères
+    messages, current, size = [], [], 0
+    for line in lines:
+        # Une ligne trop longue est coupée en plusieurs messages
+        for piece in [line[i:i + limit] for i in range(0, len(line), limit)] or [line]:
+            if current and size + 1 + len(piece) > limit:
+                messages.append("\n".join(current))
+                current, size = [], 0
+            size += len(piece) + (1 if current else 0)
+            current.append(piece)
+    if current:
+        messages.append("\n".join(current))
+    return messages
+
+
+class _Buffer:
+    __slots__ = ("channel", "lines", "size", "full", "lock", "task")
+
+    def __init__(self, channel: discord.abc.Messageable):
+        self.channel = channel
+        self.lines: List[str] = []
+        self.size = 0
+        self.full = asyncio.Event()
+        self.lock = asyncio.Lock()
+        self.task: Optional[asyncio.Task] = None
+
+
+class AuditSink:
+    # bot.audit : lignes de log Discord (récompenses, AutoRole, résumé des rappels) bufferisées
+    # par salon et envoyées en messages de ~2000 caractères au lieu d'un message par ligne.
+    #   post(channel, line) : sans attente, ordre conservé par salon
+    #   flush(channel)      : envoie tout de suite (fin de job, arrêt du bot)
+    def __init__(self, bot, interval: float = AUDIT_FLUSH_INTERVAL, limit: int = MESSAGE_LIMIT):
+        self.bot = bot
+        self.interval = interval
+        self.limit = limit
+        self._buffers: Dict[int, _Buffer] = {}
+        self.lines = 0
+        self.messages = 0
+
+    def post(self, channel: Optional[discord.abc.Messageable], line: str):
+        if channel is None:
+            return
+        buffer = self._buffers.get(channel.id)
+        if buffer is None:
+            buffer = self._buffers[channel.id] = _Buffer(channel)
+        buffer.lines.append(line)
+        buffer.size += len(line) + 1
+        self.lines += 1
+        if buffer.size >= self.limit:
+            buffer.full.set()
+        if buffer.task is None:
+            buffer.task = asyncio.create_task(self._drain(buffer), name=f"audit:{channel.id}")
+
+    async def flush(self, channel: Optional[discord.abc.Messageable] = None):
+        buffers = [self._buffers.get(channel.id)] if channel is not None else list(self._buffers.values())
+        for buffer in buffers:
+            if buffer:
+                await self._send(buffer, keep_tail=False)
+
+    async def close(self):
+        await self.flush()
+        for buffer in self._buffers.values():
+            if buffer.task:
+                buffer.task.cancel()
+
+    async def _drain(self, buffer: _Buffer):
+        try:
+            while buffer.lines:
+                if buffer.size < self.limit:
+                    try:
+                        await asyncio.wait_for(buffer.full.wait(), self.interval)
+                    except asyncio.TimeoutError:
+                        # Intervalle écoulé : on envoie aussi le dernier message incomplet
+                        await self._send(buffer, keep_tail=False)
+                        continue
+                await self._send(buffer, keep_tail=True)
+        finally:
+            buffer.task = None
+
+    async def _send(self, buffer: _Buffer, keep_tail: bool):
+        async with buffer.lock:
+            buffer.full.clear()
+            if not buffer.lines:
+                return
+            messages = pack(buffer.lines, self.limit)
+            buffer.lines, buffer.size = [], 0
+            if keep_tail and len(messages) > 1:
+                # Seuil de taille atteint : on garde le reste pour le prochain envoi
+                tail = messages.pop()
+                buffer.lines, buffer.size = [tail], len(tail) + 1
+            for n, content in enumerate(messages):
+                try:
+                    await buffer.channel.send(content)
+                    self.messages += 1
+                except discord.HTTPException as e:
+                    log.warning(
+                        "Could not send audit log to channel %s (HTTP %s), %s message(s) dropped",
+                        buffer.channel.id, e.status, len(messages) - n
+                    )
+                    return
@@ -0,0 +1,106 @@
+import asyncio
+import logging
+import os
+import random
+import time
+from typing import Any, Awaitable, Callable, Iterable, NamedTuple, Optional
+
+import discord
+
+from utils.ratelimit import TokenBucket
+
+log = logging.getLogger("dm-dispatcher")
+
+DM_CONCURRENCY = int(os.getenv("DM_CONCURRENCY", "8"))
+DM_RATE_PER_SEC = float(os.getenv("DM_RATE_PER_SEC", "5"))
+DM_MAX_RETRIES = 3
+DM_RETRY_BASE_DELAY = 2.0
+
+
+class DispatchResult(NamedTuple):
+    sent: int
+    failed: int
+    skipped: int
+    duration: float
+
+    @property
+    def rate(self) -> float:
+        return self.sent / self.duration if self.duration > 0 else 0.0
+
+
+def is_retryable(error: discord.HTTPException) -> bool:
+    return error.status == 429 or error.status >= 500
+
+
+class DMDispatcher:
+    # N workers en parallèle, un token bucket global et des retries sur 429/5xx.
+    # Forbidden / NotFound = échec définitif (DMs fermés, compte supprimé...).
+    def __init__(
+        self,
+        concurrency: int = DM_CONCURRENCY,
+        rate: float = DM_RATE_PER_SEC,
+        max_retries: int = DM_MAX_RETRIES,
+    ):
+        self.concurrency = concurrency
+        self.bucket = TokenBucket(rate, capacity=rate)
+        self.max_retries = max_retries
+
+    async def _send_with_retry(self, send: Callable[[Any], Awaitable[Any]], target: Any) -> bool:
+        for attempt in range(self.max_retries + 1):
+            await self.bucket.acquire()
+            try:
+                await send(target)
+                return True
+            except discord.HTTPException as e:
+                if not is_retryable(e) or attempt == self.max_retries:
+                    if not isinstance(e, discord.Forbidden):
+                        log.warning("DM to %s failed (HTTP %s): %s", target, e.status, e)
+                    return False
+                delay = DM_RETRY_BASE_DELAY * (2 ** attempt) + random.random()
+                log.info("DM to %s got HTTP %s, retrying in %.1fs", target, e.status, delay)
+                await asyncio.sleep(delay)
+            except Exception:
+                log.exception("Unexpected error while sending DM to %s", target)
+                return False
+        return False
+
+    async def run(
+        self,
+        targets: Iterable[Any],
+        send: Callable[[Any], Awaitable[Any]],
+        on_sent: Optional[Callable[[Any], Awaitable[Any]]] = None,
+        skipped: int = 0,
+    ) -> DispatchResult:
+        queue: asyncio.Queue = asyncio.Queue()
+        for target in targets:
+            queue.put_nowait(target)
+
+        sent = 0
+        failed = 0
+        started = time.perf_counter()
+
+        async def worker():
+            nonlocal sent, failed
+            while True:
+                try:
+                    target = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                if await self._send_with_retry(send, target):
+                    sent += 1
+                    if on_sent:
+                        try:
+                            await on_sent(target)
+                        except Exception:
+                            log.exception("Checkpoint failed for %s", target)
+                else:
+                    failed += 1
+
+        workers = [asyncio.create_task(worker()) for _ in range(max(1, min(self.concurrency, queue.qsize())))]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+
+        return DispatchResult(sent, failed, skipped, time.perf_counter() - started)
@@ -0,0 +1,396 @@
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import discord
+from discord.ext import commands
+
+from utils.leases import LeaseHeld
+from utils.progress import ProgressMessage
+
+log = logging.getLogger("jobs")
+
+# --- Layout ---
+# job:{id}          hash : kind, guild_id, channel_id, message_id, status, total, cursor, applied, failed,
+#                   chunk_ms (durée de chaque chunk en ms, JSON, cumulée entre les reprises)...
+# job:{id}:targets  liste figée à la création : [member_id, payload] en JSON
+# job:{id}:applied  set des membres déjà traités (idempotence par membre, reprise sans double crédit)
+# jobs:{guild_id}   zset des jobs du serveur (score = création)
+JOB_KEY = "job:{job_id}"
+JOB_TARGETS_KEY = "job:{job_id}:targets"
+JOB_APPLIED_KEY = "job:{job_id}:applied"
+GUILD_JOBS_KEY = "jobs:{guild_id}"
+
+JOB_CHUNK_SIZE = int(os.getenv("JOB_CHUNK_SIZE", "500"))
+JOB_TTL = 60 * 60 * 24 * 7  # jobs terminés gardés 7 jours
+GUILD_JOBS_KEPT = 50
+# Écriture du statut final (Redis coupé) : quelques essais espacés, le health check de
+# RedisManager rétablit bot.redis entre-temps
+STATUS_WRITE_ATTEMPTS = 3
+STATUS_WRITE_RETRY_DELAY = 5.0
+
+PENDING, RUNNING, DONE, CANCELLED, FAILED = "pending", "running", "done", "cancelled", "failed"
+ACTIVE = (PENDING, RUNNING)
+
+
+class JobConflict(Exception):
+    # Un job du même type est déjà actif (ou en cours de création) sur le serveur
+    def __init__(self, kind: str, job: Optional["Job"] = None):
+        self.kind = kind
+        self.job = job
+        super().__init__(f"{kind} job {job.id} is already {job.status}" if job else f"{kind} job is being created")
+
+
+class Job(NamedTuple):
+    id: str
+    kind: str
+    guild_id: int
+    channel_id: int
+    message_id: Optional[int]
+    status: str
+    total: int
+    cursor: int
+    applied: int
+    failed: int
+    params: Dict[str, Any]
+    created_by: int
+    created_at: float
+    error: Optional[str]
+    chunk_ms: List[float]
+
+    @classmethod
+    def from_hash(cls, job_id: str, data: Dict[str, str]) -> "Job":
+        return cls(
+            id=job_id,
+            kind=data["kind"],
+            guild_id=int(data["guild_id"]),
+            channel_id=int(data.get("channel_id") or 0),
+            message_id=int(data["message_id"]) if data.get("message_id") else None,
+            status=data.get("status", PENDING),
+            total=int(data.get("total", 0)),
+            cursor=int(data.get("cursor", 0)),
+            applied=int(data.get("applied", 0)),
+            failed=int(data.get("failed", 0)),
+            params=json.loads(data.get("params") or "{}"),
+            created_by=int(data.get("created_by") or 0),
+            created_at=float(data.get("created_at") or 0),
+            error=data.get("error") or None,
+            chunk_ms=json.loads(data.get("chunk_ms") or "[]"),
+        )
+
+    @property
+    def applied_key(self) -> str:
+        return JOB_APPLIED_KEY.format(job_id=self.id)
+
+    def describe(self) -> str:
+        return (
+            f"`{self.id}` **{self.kind}** — {self.status}, {self.cursor}/{self.total} processed "
+            f"({self.applied} applied, {self.failed} failed) <t:{int(self.created_at)}:R>"
+        )
+
+    def timings(self) -> str:
+        # Temps par chunk (apply + checkpoint Redis)
+        if not self.chunk_ms:
+            return "no chunk sent"
+        return (
+            f"{len(self.chunk_ms)} chunks in {sum(self.chunk_ms):.0f} ms "
+            f"(avg {sum(self.chunk_ms) / len(self.chunk_ms):.0f} ms, slowest {max(self.chunk_ms):.0f} ms)"
+        )
+
+
+class ChunkResult(NamedTuple):
+    applied: List[int]  # membres traités (marqués dans job:{id}:applied)
+    failed: int
+
+
+# apply(job, guild, entries) -> ChunkResult ; entries = [(member_id, payload)] pas encore appliqués
+ApplyChunk = Callable[[Job, discord.Guild, List[Tuple[int, Any]]], Awaitable[ChunkResult]]
+# finish(job, guild) : toujours appelé quand le job s'arrête sur cette réplique (done, cancelled,
+# failed, ou interrompu : job.status reste alors "running" et le job reprendra)
+FinishJob = Callable[[Job, discord.Guild], Awaitable[None]]
+
+
+class JobRunner:
+    # bot.jobs : jobs admin de masse (payout, monthly, retroactive, scan AutoRole) exécutés
+    # en tâche de fond, par chunks, avec curseur et membres traités persistés dans Redis.
+    # Après un crash, le job reprend au dernier chunk validé ; les membres déjà traités
+    # (set applied) sont sautés.
+    def __init__(self, bot: commands.Bot, chunk_size: int = JOB_CHUNK_SIZE):
+        self.bot = bot
+        self.chunk_size = chunk_size
+        self.kinds: Dict[str, Tuple[ApplyChunk, Optional[FinishJob]]] = {}
+        self.running: Dict[str, asyncio.Task] = {}
+        self._resumed = False
+        bot.add_listener(self.on_ready, "on_ready")
+
+    @property
+    def redis(self):
+        return getattr(self.bot, "redis", None)
+
+    def register(self, kind: str, apply: ApplyChunk, finish: Optional[FinishJob] = None):
+        self.kinds[kind] = (apply, finish)
+
+    def unregister(self, kind: str):
+        self.kinds.pop(kind, None)
+
+    # --- Lecture ---
+    async def get(self, job_id: str) -> Optional[Job]:
+        data = await self.redis.hgetall(JOB_KEY.format(job_id=job_id))
+        return Job.from_hash(job_id, data) if data else None
+
+    async def recent(self, guild_id: int, limit: int = 10) -> List[Job]:
+        job_ids = await self.redis.zrevrange(GUILD_JOBS_KEY.format(guild_id=guild_id), 0, limit - 1)
+        if not job_ids:
+            return []
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for job_id in job_ids:
+                pipe.hgetall(JOB_KEY.format(job_id=job_id))
+            replies = await pipe.execute()
+        return [Job.from_hash(job_id, data) for job_id, data in zip(job_ids, replies) if data]
+
+    # --- Création ---
+    async def create(
+        self,
+        kind: str,
+        guild: discord.Guild,
+        channel: discord.abc.Messageable,
+        targets: Iterable[Tuple[int, Any]],
+        params: Dict[str, Any] = None,
+        created_by: int = 0,
+    ) -> Job:
+        # La liste des membres est figée ici : une reprise traite exactement les mêmes cibles
+        if kind not in self.kinds:
+            raise ValueError(f"Unknown job kind: {kind}")
+        # Verrou court : deux déclenchements simultanés (double clic, autre réplique) -> un seul job
+        try:
+            async with self.bot.leases.lock(f"job-create:{kind}:{guild.id}"):
+                for job in await self.recent(guild.id, limit=GUILD_JOBS_KEPT):
+                    if job.kind == kind and job.status in ACTIVE:
+                        raise JobConflict(kind, job)
+                job_id = await self._store(kind, guild, channel, targets, params, created_by)
+        except LeaseHeld:
+            raise JobConflict(kind) from None
+        self.start(job_id)
+        return await self.get(job_id)
+
+    async def _store(self, kind, guild, channel, targets, params, created_by) -> str:
+        job_id = uuid.uuid4().hex[:10]
+        targets = [json.dumps([member_id, payload], separators=(",", ":")) for member_id, payload in targets]
+        now = time.time()
+        job_key = JOB_KEY.format(job_id=job_id)
+        targets_key = JOB_TARGETS_KEY.format(job_id=job_id)
+        guild_key = GUILD_JOBS_KEY.format(guild_id=guild.id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(job_key, mapping={
+                "kind": kind, "guild_id": guild.id, "channel_id": getattr(channel, "id", 0) or 0,
+                "status": PENDING, "total": len(targets), "cursor": 0, "applied": 0, "failed": 0,
+                "params": json.dumps(params or {}), "created_by": created_by, "created_at": now,
+            })
+            for start in range(0, len(targets), self.chunk_size):
+                pipe.rpush(targets_key, *targets[start:start + self.chunk_size])
+            pipe.zadd(guild_key, {job_id: now})
+            pipe.zremrangebyrank(guild_key, 0, -GUILD_JOBS_KEPT - 1)
+            await pipe.execute()
+
+        log.info("🧾 Job %s (%s) created in guild %s: %s targets", job_id, kind, guild.id, len(targets))
+        return job_id
+
+    async def launch(
+        self,
+        kind: str,
+        guild: discord.Guild,
+        channel: discord.abc.Messageable,
+        user_id: int,
+        targets: Iterable[Tuple[int, Any]],
+        params: Dict[str, Any] = None,
+    ) -> str:
+        # Création depuis une commande admin : renvoie le message à afficher
+        if not self.redis:
+            return "⚠️ Redis is unavailable, try again in a moment."
+        try:
+            job = await self.create(kind, guild, channel, targets, params, created_by=user_id)
+        except JobConflict as e:
+            if e.job is None:
+                return f"⏳ A `{kind}` job is already being started for this server."
+            return f"⏳ A `{kind}` job is already running: {e.job.describe()}\nUse `/job cancel` or `/job resume`."
+        return f"🧾 Job started in the background: {job.describe()}\nFollow it with `/job status {job.id}`."
+
+    # --- Contrôle ---
+    def start(self, job_id: str) -> asyncio.Task:
+        task = self.running.get(job_id)
+        if task and not task.done():
+            return task
+        task = asyncio.create_task(self._run(job_id), name=f"job:{job_id}")
+        self.running[job_id] = task
+        task.add_done_callback(lambda _: self.running.pop(job_id, None))
+        return task
+
+    async def cancel(self, job_id: str) -> Optional[Job]:
+        # Le statut est lu entre deux chunks par la réplique qui exécute le job
+        job = await self.get(job_id)
+        if job is None or job.status not in ACTIVE:
+            return job
+        await self.redis.hset(JOB_KEY.format(job_id=job_id), "status", CANCELLED)
+        task = self.running.get(job_id)
+        if task:
+            task.cancel()
+        log.info("🛑 Job %s (%s) cancelled", job_id, job.kind)
+        return await self.get(job_id)
+
+    async def resume(self, job_id: str) -> Optional[Job]:
+        job = await self.get(job_id)
+        if job is None or job.status == DONE:
+            return job
+        if job.status in (CANCELLED, FAILED):
+            await self.redis.hset(JOB_KEY.format(job_id=job_id), mapping={"status": PENDING, "error": ""})
+        self.start(job_id)
+        return await self.get(job_id)
+
+    async def on_ready(self):
+        # Reprise automatique des jobs interrompus (une seule fois par process)
+        if self._resumed or not self.redis:
+            return
+        self._resumed = True
+        for guild in self.bot.guilds:
+            for job in await self.recent(guild.id, limit=GUILD_JOBS_KEPT):
+                if job.status in ACTIVE and job.id not in self.running:
+                    log.info("♻️ Resuming interrupted job %s (%s) at %s/%s", job.id, job.kind, job.cursor, job.total)
+                    self.start(job.id)
+
+    # --- Exécution ---
+    async def _run(self, job_id: str):
+        leases = self.bot.leases
+        # Le détenteur précédent (process mort) garde son verrou jusqu'à LEASE_TTL : on réessaie
+        for attempt in range(3):
+            try:
+                async with leases.lock(f"job-run:{job_id}"):
+                    await self._execute(job_id)
+                return
+            except LeaseHeld as e:
+                if e.holder is None or attempt == 2:
+                    log.info("Job %s not started: lock held by %s", job_id, e.holder)
+                    return
+                await asyncio.sleep(leases.ttl)
+
+    async def _execute(self, job_id: str):
+        if not self.redis:
+            log.warning("Job %s not started: Redis is unavailable (use /job resume later)", job_id)
+            return
+        job = await self.get(job_id)
+        if job is None or job.status not in ACTIVE:
+            return
+        guild = self.bot.get_guild(job.guild_id)
+        if guild is None or job.kind not in self.kinds:
+            log.warning("Job %s (%s) cannot run here (guild or kind missing)", job_id, job.kind)
+            return
+        apply, finish = self.kinds[job.kind]
+        job_key = JOB_KEY.format(job_id=job_id)
+        targets_key = JOB_TARGETS_KEY.format(job_id=job_id)
+
+        channel = guild.get_channel(job.channel_id)
+        progress = ProgressMessage(channel, message=self._message(channel, job.message_id)) if channel else None
+
+        async with self.bot.shard_jobs.lane(guild, job.kind):
+            try:
+                started = time.perf_counter()
+                cursor, status = job.cursor, RUNNING
+                chunk_ms = list(job.chunk_ms)
+                try:
+                    await self.redis.hset(job_key, mapping={"status": RUNNING, "owner": self.bot.leases.owner})
+                    while cursor < job.total:
+                        chunk_started = time.perf_counter()
+                        raw = await self.redis.lrange(targets_key, cursor, cursor + self.chunk_size - 1)
+                        entries = [tuple(json.loads(item)) for item in raw]
+                        done = await self.redis.smismember(job.applied_key, [member_id for member_id, _ in entries])
+                        todo = [entry for entry, seen in zip(entries, done) if not seen]
+
+                        result = await apply(job, guild, todo) if todo else ChunkResult([], 0)
+                        cursor += len(entries)
+                        async with self.redis.pipeline(transaction=True) as pipe:
+                            if result.applied:
+                                pipe.sadd(job.applied_key, *result.applied)
+                            pipe.hset(job_key, "cursor", cursor)
+                            pipe.hincrby(job_key, "applied", len(result.applied))
+                            pipe.hincrby(job_key, "failed", result.failed)
+                            pipe.hget(job_key, "status")
+                            status = (await pipe.execute())[-1]
+                        chunk_ms.append(round((time.perf_counter() - chunk_started) * 1000, 1))
+
+                        job = job._replace(cursor=cursor, applied=job.applied + len(result.applied), failed=job.failed + result.failed)
+                        if progress:
+                            await progress.update(f"⚙️ {job.describe()}")
+                            if progress.message is not None and job.message_id is None:
+                                job = job._replace(message_id=progress.message.id)
+                                await self.redis.hset(job_key, "message_id", progress.message.id)
+                        if status == CANCELLED:
+                            break
+                        await asyncio.sleep(0)
+                    else:
+                        status = DONE
+                except asyncio.CancelledError:
+                    if await self._read_status(job_key) != CANCELLED:
+                        raise  # arrêt du bot : le job reste "running" et reprendra au démarrage
+                    status = CANCELLED
+                except Exception as e:
+                    log.exception("❌ Job %s (%s) failed at %s/%s", job_id, job.kind, cursor, job.total)
+                    status = FAILED
+                    job = job._replace(error=f"{type(e).__name__}: {e}"[:200])
+
+                final = {"status": status, "finished_at": time.time(), "chunk_ms": json.dumps(chunk_ms)}
+                if job.error:
+                    final["error"] = job.error
+                expiring = (job_key, targets_key, job.applied_key) if status == DONE else ()
+                await self._write_status(job_id, final, expiring)
+                job = job._replace(status=status, chunk_ms=chunk_ms)
+                log.info(
+                    "🧾 Job %s (%s) %s: %s/%s processed, %s applied, %s failed in %.1fs — %s",
+                    job_id, job.kind, status, job.cursor, job.total, job.applied, job.failed, time.perf_counter() - started,
+                    job.timings(),
+                )
+                if progress:
+                    await progress.update(f"{'✅' if status == DONE else '⏹️'} {job.describe()}", force=True)
+            finally:
+                # Même si le job est interrompu (arrêt, verrou perdu) : le cog libère son état
+                if finish:
+                    try:
+                        await finish(job, guild)
+                    except Exception:
+                        log.exception("Job %s (%s): finish step failed", job_id, job.kind)
+
+    async def _read_status(self, job_key: str) -> Optional[str]:
+        try:
+            return await self.redis.hget(job_key, "status") if self.redis else None
+        except Exception:
+            log.exception("Could not read status of %s", job_key)
+            return None
+
+    async def _write_status(self, job_id: str, mapping: Dict[str, Any], expiring: Tuple[str, ...] = ()):
+        # Statut final : jamais d'exception ici (Redis peut être la cause de l'échec du job).
+        # Si l'écriture échoue toujours, le job reste "running" et reprendra au prochain on_ready
+        job_key = JOB_KEY.format(job_id=job_id)
+        for attempt in range(STATUS_WRITE_ATTEMPTS):
+            if attempt:
+                await asyncio.sleep(STATUS_WRITE_RETRY_DELAY)
+            if not self.redis:
+                continue
+            try:
+                async with self.redis.pipeline(transaction=True) as pipe:
+                    pipe.hset(job_key, mapping=mapping)
+                    for key in expiring:
+                        pipe.expire(key, JOB_TTL)
+                    await pipe.execute()
+                return
+            except Exception:
+                log.exception("Could not save status of job %s (attempt %s)", job_id, attempt + 1)
+        log.error("❌ Job %s: final status %s not saved, Redis unavailable", job_id, mapping["status"])
+
+    @staticmethod
+    def _message(channel, message_id: Optional[int]):
+        # Message de progression d'avant le redémarrage (édité sur place)
+        if message_id is None or not hasattr(channel, "get_partial_message"):
+            return None
+        return channel.get_partial_message(message_id)
@@ -0,0 +1,217 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import Callable, Dict, Optional
+
+from discord.ext import commands
+
+log = logging.getLogger("leases")
+
+# --- Config ---
+# Identité de ce process (un par réplique) ; visible dans Redis comme valeur du lease
+REPLICA_ID = os.getenv("REPLICA_ID") or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+# Un lease expire LEASE_TTL s après son dernier renouvellement : reprise par une autre réplique
+# en au plus LEASE_TTL + LEASE_TTL / 3 si le détenteur meurt
+LEASE_TTL = float(os.getenv("LEASE_TTL", "30"))
+# Déduplication des commandes préfixe (le même message arrive sur toutes les répliques)
+COMMAND_CLAIM_TTL = 60 * 60
+
+LEASE_KEY = "lease:{name}"
+COMMAND_CLAIM_KEY = "command-claim:{message_id}"
+
+# Renouvelle / libère seulement si le lease appartient encore à cette réplique
+RENEW_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class LeaseHeld(Exception):
+    # Job déjà en cours (sur cette réplique ou une autre), ou Redis indisponible
+    def __init__(self, name: str, holder: Optional[str]):
+        self.name = name
+        self.holder = holder
+        super().__init__(f"{name} is held by {holder or 'unknown (Redis unavailable)'}")
+
+
+class LeaseManager:
+    # bot.leases : leases Redis renouvelables.
+    #   singleton(name, start, stop) : job périodique actif sur une seule réplique à la fois
+    #   lock(name)                   : verrou d'un job ponctuel (commandes admin de masse)
+    #   install()                    : une seule réplique exécute une commande préfixe donnée
+    def __init__(self, bot: commands.Bot, owner: str = REPLICA_ID, ttl: float = LEASE_TTL):
+        self.bot = bot
+        self.owner = owner
+        self.ttl = ttl
+        self.held: Dict[str, bool] = {}
+        self._singletons: Dict[str, asyncio.Task] = {}
+        self._scripts = {}
+        self._script_client = None
+
+    @property
+    def redis(self):
+        return getattr(self.bot, "redis", None)
+
+    def _script(self, source: str):
+        # Même logique que Wallet : scripts liés au client courant
+        client = self.redis
+        if self._script_client is not client:
+            self._scripts = {}
+            self._script_client = client
+        if source not in self._scripts:
+            self._scripts[source] = client.register_script(source)
+        return self._scripts[source]
+
+    # --- Primitives ---
+    async def acquire(self, name: str, reentrant: bool = True) -> bool:
+        if not self.redis:
+            return False
+        key = LEASE_KEY.format(name=name)
+        if await self.redis.set(key, self.owner, nx=True, px=int(self.ttl * 1000)):
+            return True
+        # Déjà à nous (job singleton relancé sur la même réplique) : on prolonge
+        return reentrant and await self.renew(name)
+
+    async def renew(self, name: str) -> bool:
+        if not self.redis:
+            return False
+        key = LEASE_KEY.format(name=name)
+        return bool(await self._script(RENEW_SCRIPT)(keys=[key], args=[self.owner, int(self.ttl * 1000)]))
+
+    async def release(self, name: str):
+        if not self.redis:
+            return
+        try:
+            await self._script(RELEASE_SCRIPT)(keys=[LEASE_KEY.format(name=name)], args=[self.owner])
+        except Exception:
+            log.exception("Could not release lease %s", name)
+
+    async def holder(self, name: str) -> Optional[str]:
+        if not self.redis:
+            return None
+        return await self.redis.get(LEASE_KEY.format(name=name))
+
+    # --- Jobs singletons ---
+    def singleton(self, name: str, start: Callable[[], None], stop: Callable[[], None]):
+        # start() quand on obtient le lease, stop() quand on le perd (ou à l'arrêt).
+        # Sans effet si le job est déjà inscrit (on_ready se redéclenche à chaque reconnexion)
+        if name in self._singletons:
+            return
+        self._singletons[name] = asyncio.create_task(self._elect(name, start, stop), name=f"lease:{name}")
+
+    async def stop_singleton(self, name: str):
+        task = self._singletons.pop(name, None)
+        if task:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def _elect(self, name: str, start: Callable[[], None], stop: Callable[[], None]):
+        interval = self.ttl / 3
+        leader = False
+        renewed = 0.0
+        try:
+            while True:
+                # ok = None : état inconnu (Redis coupé ou bot.redis remplacé par RedisManager)
+                ok = None
+                try:
+                    if self.redis:
+                        ok = await (self.renew(name) if leader else self.acquire(name))
+                except Exception:
+                    log.exception("Lease %s: Redis error", name)
+
+                if ok:
+                    renewed = time.monotonic()
+                    if not leader:
+                        leader = True
+                        log.info("👑 Lease %s acquired by %s", name, self.owner)
+                        start()
+                elif leader and (ok is False or time.monotonic() - renewed >= self.ttl - interval):
+                    # Lease repris ailleurs, ou dernier tour avant son expiration côté Redis : on s'arrête
+                    # avant qu'une autre réplique puisse le prendre. Une coupure Redis plus courte
+                    # (reconnexion de RedisManager) ne coupe pas le job en cours
+                    leader = False
+                    log.warning("⚠️ Lease %s lost by %s, stopping job", name, self.owner)
+                    stop()
+                self.held[name] = leader
+                await asyncio.sleep(interval)
+        finally:
+            self.held[name] = False
+            if leader:
+                stop()
+                await self.release(name)
+
+    # --- Verrous de jobs ponctuels ---
+    @asynccontextmanager
+    async def lock(self, name: str):
+        # Lève LeaseHeld si le job tourne déjà (ici ou ailleurs) ; renouvelé tant que le bloc s'exécute.
+        # Verrou perdu (non renouvelé pendant TTL) : la tâche qui le détient est annulée, une autre
+        # réplique peut alors le prendre sans que le job tourne deux fois en même temps
+        if not await self.acquire(name, reentrant=False):
+            raise LeaseHeld(name, await self.holder(name))
+        renew_task = asyncio.create_task(self._keep_alive(name, asyncio.current_task()))
+        try:
+            yield
+        finally:
+            renew_task.cancel()
+            await self.release(name)
+
+    async def _keep_alive(self, name: str, holder: asyncio.Task):
+        renewed = time.monotonic()
+        while True:
+            await asyncio.sleep(self.ttl / 3)
+            try:
+                if await self.renew(name):
+                    renewed = time.monotonic()
+                    continue
+                log.warning("⚠️ Lock %s lost while the job was still running, stopping it", name)
+            except Exception:
+                log.exception("Lock %s: Redis error on renew", name)
+                if time.monotonic() - renewed < self.ttl:
+                    continue
+                log.warning("⚠️ Lock %s not renewed for %.0fs, stopping the job", name, self.ttl)
+            holder.cancel()
+            return
+
+    # --- Commandes préfixe ---
+    def install(self):
+        # Slash : une interaction n'est livrée qu'à une session. Préfixe : le message arrive
+        # sur chaque réplique, la première qui le réclame exécute la commande.
+        bot = self.bot
+
+        async def process_commands(message):
+            if message.author.bot:
+                return
+            ctx = await bot.get_context(message)
+            if ctx.command is not None and not await self.claim_message(message.id):
+                log.debug("Command %s already handled by another replica", message.id)
+                return
+            await bot.invoke(ctx)
+
+        bot.process_commands = process_commands
+
+    async def claim_message(self, message_id: int) -> bool:
+        if not self.redis:
+            return True
+        try:
+            key = COMMAND_CLAIM_KEY.format(message_id=message_id)
+            return bool(await self.redis.set(key, self.owner, nx=True, ex=COMMAND_CLAIM_TTL))
+        except Exception:
+            log.exception("Could not claim command %s", message_id)
+            return True
+
+    async def close(self):
+        for name in list(self._singletons):
+            await self.stop_singleton(name)
+
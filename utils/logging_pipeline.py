@@ -0,0 +1,115 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from typing import Dict, Tuple
+
+from utils.ratelimit import TokenBucket
+
+# --- Config ---
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")  # json | text
+# Limites par logger : "cog-log=20:100,discord.gateway=5" (records/sec[:burst])
+LOG_RATE_LIMITS = os.getenv("LOG_RATE_LIMITS", "cog-log=20:100")
+TEXT_FORMAT = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+
+# Attributs standards d'un LogRecord : tout le reste vient de extra={...}
+RESERVED_ATTRS = frozenset(logging.makeLogRecord({}).__dict__) | {"message", "asctime"}
+
+
+def parse_rate_limits(spec: str) -> Dict[str, Tuple[float, float]]:
+    limits = {}
+    for entry in spec.split(","):
+        name, _, value = entry.strip().partition("=")
+        if not name or not value:
+            continue
+        rate, _, burst = value.partition(":")
+        limits[name] = (float(rate), float(burst) if burst else float(rate))
+    return limits
+
+
+class JsonFormatter(logging.Formatter):
+    # Une ligne JSON par record, champs extra={...} inclus tels quels
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in RESERVED_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    # Token bucket par logger (préfixe de nom), les records au-dessus de la limite sont
+    # jetés avant l'enqueue ; le prochain record accepté porte le nombre de records perdus.
+    # WARNING et au-dessus ne sont jamais limités.
+    def __init__(self, limits: Dict[str, Tuple[float, float]]):
+        super().__init__()
+        self.buckets = {name: TokenBucket(rate, burst) for name, (rate, burst) in limits.items()}
+        self.dropped = dict.fromkeys(self.buckets, 0)
+        self._resolved: Dict[str, str] = {}
+
+    def _bucket_name(self, logger_name: str):
+        if logger_name not in self._resolved:
+            match = None
+            for name in self.buckets:
+                if logger_name == name or logger_name.startswith(name + "."):
+                    if match is None or len(name) > len(match):
+                        match = name
+            self._resolved[logger_name] = match
+        return self._resolved[logger_name]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        name = self._bucket_name(record.name)
+        if name is None:
+            return True
+        if not self.buckets[name].try_acquire():
+            self.dropped[name] += 1
+            return False
+        if self.dropped[name]:
+            record.dropped = self.dropped[name]
+            self.dropped[name] = 0
+        return True
+
+
+class LoopQueueHandler(logging.handlers.QueueHandler):
+    # Côté event loop : un simple put du record, le formatage se fait sur le thread d'écriture
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def setup_logging(level: str = LOG_LEVEL, fmt: str = LOG_FORMAT, rate_limits: str = LOG_RATE_LIMITS):
+    writer = logging.StreamHandler(sys.stdout)
+    writer.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT))
+
+    records = queue.SimpleQueue()
+    handler = LoopQueueHandler(records)
+    handler.addFilter(RateLimitFilter(parse_rate_limits(rate_limits)))
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+    listener = logging.handlers.QueueListener(records, writer, respect_handler_level=True)
+    listener.start()
+    atexit.register(stop_listener, listener)
+    return listener
+
+
+def stop_listener(listener: logging.handlers.QueueListener):
+    # Vide la queue avant la sortie (sans erreur si déjà arrêté)
+    if listener._thread is not None:
+        listener.stop()
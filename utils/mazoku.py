@@ -0,0 +1,72 @@
+import re
+from typing import NamedTuple, Optional, Tuple
+
+import discord
+
+# --- Rarity emojis ---
+RARITY_EMOTES = {
+    "1342202597389373530": "SR",
+    "1342202212948115510": "SSR",
+    "1342202203515125801": "UR"
+}
+# Un seul pattern, limité aux emotes de rareté connues (pas de findall + lookup par match)
+RARITY_REGEX = re.compile(r"<a?:\w+:(" + "|".join(map(re.escape, RARITY_EMOTES)) + r")>")
+
+# --- Event types ---
+EVENT_AUTO_SUMMON = "auto_summon"
+EVENT_SUMMON = "summon"
+EVENT_OTHER = "other"
+
+
+class MazokuEmbed(NamedTuple):
+    event: str
+    rarity: Optional[str]
+    claimed: bool
+    title: str
+    description: str
+    fields: Tuple[Tuple[str, str], ...]  # (name, value) des champs de la carte
+    footer: str
+
+
+def classify(title: str) -> str:
+    if "auto summon" in title:
+        return EVENT_AUTO_SUMMON
+    if "summon" in title:
+        return EVENT_SUMMON
+    return EVENT_OTHER
+
+
+def find_rarity(title: str, description: str, fields, footer: str) -> Optional[str]:
+    # Même ordre de priorité qu'avant (titre, description, champs, footer), arrêt au premier match
+    search = RARITY_REGEX.search
+    match = search(title) or search(description)
+    if not match:
+        for name, value in fields:
+            match = search(name) or search(value)
+            if match:
+                break
+        else:
+            match = search(footer)
+    return RARITY_EMOTES[match.group(1)] if match else None
+
+
+def parse_embed(embed: discord.Embed) -> MazokuEmbed:
+    # Lecture directe des dicts internes : embed.fields / embed.footer recréent des EmbedProxy à chaque accès
+    title = embed.title or ""
+    description = embed.description or ""
+    # Liste en compréhension plutôt qu'un générateur : pas de frame de générateur allouée par message
+    raw_fields = getattr(embed, "_fields", None)
+    fields = tuple([(field.get("name") or "", field.get("value") or "") for field in raw_fields]) if raw_fields else ()
+    footer = getattr(embed, "_footer", None)
+    footer = (footer.get("text") or "") if footer else ""
+    lowered = title.lower()
+
+    return MazokuEmbed(
+        event=classify(lowered),
+        rarity=find_rarity(title, description, fields, footer),
+        claimed="claimed" in lowered,
+        title=title,
+        description=description,
+        fields=fields,
+        footer=footer,
+    )
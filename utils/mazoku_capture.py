@@ -0,0 +1,72 @@
+import json
+import logging
+import logging.handlers
+import os
+import queue
+from typing import Optional
+
+from utils.logging_pipeline import LoopQueueHandler, stop_listener
+from utils.mazoku_router import MazokuMessage, MazokuRouter
+
+log = logging.getLogger("mazoku-capture")
+
+# --- Config (capture désactivée si MAZOKU_CAPTURE_PATH est vide) ---
+MAZOKU_CAPTURE_PATH = os.getenv("MAZOKU_CAPTURE_PATH", "")
+MAZOKU_CAPTURE_MAX_BYTES = int(os.getenv("MAZOKU_CAPTURE_MAX_BYTES", str(20 * 1024 * 1024)))
+MAZOKU_CAPTURE_BACKUPS = int(os.getenv("MAZOKU_CAPTURE_BACKUPS", "5"))
+
+
+def serialize(event: MazokuMessage) -> dict:
+    message = event.message
+    return {
+        "kind": "edit" if event.edited else "message",
+        "id": message.id,
+        "guild_id": message.guild.id,
+        "channel_id": message.channel.id,
+        "author_id": message.author.id,
+        "created_at": message.created_at.timestamp(),
+        "edited_at": message.edited_at.timestamp() if message.edited_at else None,
+        "content": message.content,
+        "embeds": [embed.to_dict() for embed in message.embeds],
+    }
+
+
+class CaptureFormatter(logging.Formatter):
+    # JSON compact, une ligne par message (formaté sur le thread d'écriture)
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps(record.msg, ensure_ascii=False, separators=(",", ":"))
+
+
+class MazokuCapture:
+    # Enregistre chaque message / edit Mazoku reçu par le routeur dans un fichier JSONL
+    # tournant, rejouable avec tools/replay_mazoku.py
+    def __init__(self, router: MazokuRouter, path: str, max_bytes: int = MAZOKU_CAPTURE_MAX_BYTES,
+                 backups: int = MAZOKU_CAPTURE_BACKUPS):
+        self.router = router
+        self.path = path
+        self.count = 0
+        writer = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+        writer.setFormatter(CaptureFormatter())
+
+        records = queue.SimpleQueue()
+        self._logger = logging.Logger("mazoku-capture-writer")
+        self._logger.addHandler(LoopQueueHandler(records))
+        self._listener = logging.handlers.QueueListener(records, writer)
+        self._listener.start()
+        router.subscribe(self.on_mazoku_message, messages=True, edits=True)
+        log.info("🎥 Mazoku capture enabled -> %s", path)
+
+    async def on_mazoku_message(self, event: MazokuMessage):
+        self._logger.info(serialize(event))
+        self.count += 1
+
+    def close(self):
+        self.router.unsubscribe(self.on_mazoku_message)
+        stop_listener(self._listener)
+
+
+def start_capture(router: MazokuRouter, path: str = MAZOKU_CAPTURE_PATH) -> Optional[MazokuCapture]:
+    if not path:
+        return None
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    return MazokuCapture(router, path)
@@ -0,0 +1,99 @@
+import asyncio
+import logging
+import os
+from typing import Awaitable, Callable, Dict, FrozenSet, List, NamedTuple, Optional
+
+import discord
+from discord.ext import commands
+
+from utils.mazoku import MazokuEmbed, parse_embed
+
+log = logging.getLogger("mazoku-router")
+
+# --- Env IDs ---
+MAZOKU_BOT_ID = int(os.getenv("MAZOKU_BOT_ID", "0"))
+
+
+def env_guild_ids(name: str) -> FrozenSet[int]:
+    # "1,2" -> {1, 2} ; vide ou "0" -> aucun serveur
+    return frozenset(int(x) for x in os.getenv(name, "").split(",") if x.strip() and int(x))
+
+
+def mazoku_guild_ids() -> FrozenSet[int]:
+    # Le routeur accepte l'union des configs historiques : GUILD_IDS (cooldowns) et GUILD_ID (log).
+    # Chaque feature garde son propre scope via subscribe(..., guild_ids=router.scope(...))
+    return env_guild_ids("GUILD_IDS") | env_guild_ids("GUILD_ID")
+
+
+class MazokuMessage(NamedTuple):
+    message: discord.Message          # message (ou version éditée)
+    embed: Optional[MazokuEmbed]      # premier embed parsé, None si pas d'embed
+    edited: bool
+    before: Optional[discord.Message]  # ancienne version pour les edits (si en cache)
+
+
+MazokuHandler = Callable[[MazokuMessage], Awaitable[None]]
+
+
+class MazokuRouter:
+    # Un seul passage par message : filtre auteur/serveur (sets), parse l'embed une
+    # fois puis distribue le MazokuMessage aux features abonnées.
+    def __init__(self, bot: commands.Bot, bot_id: int = MAZOKU_BOT_ID, guild_ids: FrozenSet[int] = None):
+        self.bot_id = bot_id
+        self._from_env = guild_ids is None
+        self.guild_ids = mazoku_guild_ids() if guild_ids is None else frozenset(guild_ids)
+        self._message_handlers: List[MazokuHandler] = []
+        self._edit_handlers: List[MazokuHandler] = []
+        # handler -> serveurs de la feature (absent = tous les serveurs du routeur)
+        self._scopes: Dict[MazokuHandler, FrozenSet[int]] = {}
+        bot.add_listener(self.on_message, "on_message")
+        bot.add_listener(self.on_message_edit, "on_message_edit")
+        log.info("⚙️ Mazoku router ready (MAZOKU_BOT_ID=%s, guilds=%s)", self.bot_id, sorted(self.guild_ids))
+
+    def scope(self, env_name: str) -> Optional[FrozenSet[int]]:
+        # Serveurs d'une feature d'après sa variable d'env ; None (tous) si le routeur a reçu
+        # une liste explicite (replay, bench)
+        return env_guild_ids(env_name) if self._from_env else None
+
+    def subscribe(
+        self, handler: MazokuHandler, messages: bool = True, edits: bool = False, guild_ids: FrozenSet[int] = None
+    ):
+        for enabled, handlers in ((messages, self._message_handlers), (edits, self._edit_handlers)):
+            if enabled and handler not in handlers:
+                handlers.append(handler)
+        if guild_ids is not None:
+            self._scopes[handler] = frozenset(guild_ids)
+
+    def unsubscribe(self, handler: MazokuHandler):
+        for handlers in (self._message_handlers, self._edit_handlers):
+            if handler in handlers:
+                handlers.remove(handler)
+        self._scopes.pop(handler, None)
+
+    def accepts(self, message: discord.Message) -> bool:
+        guild = message.guild
+        return message.author.id == self.bot_id and guild is not None and guild.id in self.guild_ids
+
+    def classify(self, message: discord.Message, edited: bool = False, before: discord.Message = None) -> MazokuMessage:
+        embed = parse_embed(message.embeds[0]) if message.embeds else None
+        return MazokuMessage(message, embed, edited, before)
+
+    async def on_message(self, message: discord.Message):
+        if not self._message_handlers or not self.accepts(message):
+            return
+        await self.dispatch(self._message_handlers, self.classify(message))
+
+    async def on_message_edit(self, before: discord.Message, after: discord.Message):
+        if not self._edit_handlers or not self.accepts(after):
+            return
+        await self.dispatch(self._edit_handlers, self.classify(after, edited=True, before=before))
+
+    async def dispatch(self, handlers: List[MazokuHandler], event: MazokuMessage):
+        guild_id = event.message.guild.id
+        handlers = [h for h in handlers if h not in self._scopes or guild_id in self._scopes[h]]
+        if not handlers:
+            return
+        results = await asyncio.gather(*(handler(event) for handler in handlers), return_exceptions=True)
+        for handler, result in zip(handlers, results):
+            if isinstance(result, Exception):
+                log.error("Mazoku handler %s failed", getattr(handler, "__qualname__", handler), exc_info=result)
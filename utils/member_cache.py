@@ -0,0 +1,119 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, Iterable, List
+
+import discord
+from discord.ext import commands
+
+log = logging.getLogger("member-cache")
+
+# --- Config ---
+# full : cache de tous les membres, chunk de chaque serveur au démarrage (comportement historique)
+# lean : seuls les membres vus passer (arrivées / updates) sont gardés, pas de chunk au démarrage ;
+#        les jobs sur tout le serveur récupèrent la liste à la demande (sans la mettre en cache)
+MEMBER_CACHE_MODE = os.getenv("MEMBER_CACHE_MODE", "full").lower()
+ROSTER_TTL = float(os.getenv("ROSTER_TTL", "60"))
+
+
+def is_lean() -> bool:
+    return MEMBER_CACHE_MODE == "lean"
+
+
+def bot_options(intents: discord.Intents) -> dict:
+    # kwargs du commands.Bot selon le mode
+    if not is_lean():
+        return {}
+    flags = discord.MemberCacheFlags.none()
+    flags.joined = True
+    return {"member_cache_flags": flags, "chunk_guilds_at_startup": False}
+
+
+class Roster:
+    # Liste complète des membres d'un serveur pour un job (AutoRole, payouts, rappels...)
+    def __init__(self, guild: discord.Guild, members: Iterable[discord.Member]):
+        self.guild = guild
+        self.members: List[discord.Member] = list(members)
+        self.fetched_at = time.monotonic()
+        self._by_id = None
+        self._by_role = None
+
+    def __len__(self) -> int:
+        return len(self.members)
+
+    def get(self, member_id: int):
+        if self._by_id is None:
+            self._by_id = {member.id: member for member in self.members}
+        return self._by_id.get(member_id)
+
+    def with_role(self, role_id: int) -> List[discord.Member]:
+        # Index rôle -> membres construit une fois (un passage) au lieu de role.members par rôle
+        if self._by_role is None:
+            by_role: Dict[int, List[discord.Member]] = {}
+            for member in self.members:
+                for rid in member._roles:
+                    by_role.setdefault(rid, []).append(member)
+            self._by_role = by_role
+        return self._by_role.get(role_id, [])
+
+
+class RosterCache:
+    # bot.rosters : en mode full, le cache discord.py suffit ; en mode lean, un chunk
+    # (cache=False) par serveur, partagé par les jobs concurrents et gardé ROSTER_TTL secondes.
+    def __init__(self, bot: commands.Bot, ttl: float = ROSTER_TTL):
+        self.bot = bot
+        self.ttl = ttl
+        self._rosters: Dict[int, Roster] = {}
+        self._pending: Dict[int, asyncio.Future] = {}
+
+    async def get(self, guild: discord.Guild) -> Roster:
+        if not is_lean() or guild.chunked:
+            return Roster(guild, guild.members)
+
+        roster = self._rosters.get(guild.id)
+        if roster is not None and time.monotonic() - roster.fetched_at < self.ttl:
+            return roster
+
+        pending = self._pending.get(guild.id)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = self._pending[guild.id] = asyncio.get_running_loop().create_future()
+        try:
+            started = time.perf_counter()
+            members = await guild.chunk(cache=False)
+            roster = Roster(guild, members)
+            log.info("👥 Fetched %s members of %s on demand in %.1fs", len(roster), guild.name, time.perf_counter() - started)
+            self._rosters[guild.id] = roster
+            asyncio.get_running_loop().call_later(self.ttl, self._expire, guild.id, roster)
+            future.set_result(roster)
+            return roster
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # évite "exception never retrieved" si personne n'attendait
+            raise
+        finally:
+            del self._pending[guild.id]
+
+    def _expire(self, guild_id: int, roster: Roster):
+        if self._rosters.get(guild_id) is roster:
+            del self._rosters[guild_id]
+
+
+def install_uncached_member_updates(bot: commands.Bot):
+    # Sans cache complet, discord.py ignore le premier GUILD_MEMBER_UPDATE d'un membre inconnu
+    # (il le met seulement en cache). On le signale via l'event "uncached_member_update".
+    state = bot._connection
+    parse = state.parsers["GUILD_MEMBER_UPDATE"]
+
+    def parse_guild_member_update(data):
+        guild = state._get_guild(int(data["guild_id"]))
+        known = guild is None or guild.get_member(int(data["user"]["id"])) is not None
+        parse(data)
+        if not known:
+            member = guild.get_member(int(data["user"]["id"]))
+            if member is not None:
+                state.dispatch("uncached_member_update", member)
+
+    state.parsers["GUILD_MEMBER_UPDATE"] = parse_guild_member_update
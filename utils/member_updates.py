@@ -0,0 +1,93 @@
+import asyncio
+import logging
+import os
+from typing import Awaitable, Callable, Dict, FrozenSet, List, NamedTuple, Tuple
+
+import discord
+from discord.ext import commands
+
+log = logging.getLogger("member-updates")
+
+# Fenêtre de regroupement des on_member_update d'un même membre (secondes)
+MEMBER_UPDATE_WINDOW = float(os.getenv("MEMBER_UPDATE_WINDOW", "1.5"))
+
+
+class RoleChange(NamedTuple):
+    member: discord.Member        # état le plus récent
+    added: FrozenSet[int]         # ids de rôles ajoutés sur toute la rafale
+    removed: FrozenSet[int]       # ids de rôles retirés sur toute la rafale
+    partial: bool = False         # membre absent du cache (mode lean) : rôles d'avant inconnus
+
+
+RoleChangeHandler = Callable[[RoleChange], Awaitable[None]]
+
+
+def role_ids(member: discord.Member) -> FrozenSet[int]:
+    # member._roles = liste triée des ids, sans passer par member.roles (tri + lookups)
+    return frozenset(member._roles)
+
+
+class MemberUpdateDispatcher:
+    # Un seul listener on_member_update pour tout le bot : ignore les updates sans
+    # changement de rôle (pseudo, avatar...), regroupe les rafales d'un même membre
+    # et publie un seul RoleChange (diff calculé une fois) aux abonnés.
+    def __init__(self, bot: commands.Bot, window: float = MEMBER_UPDATE_WINDOW):
+        self.window = window
+        self._handlers: List[RoleChangeHandler] = []
+        # (guild_id, member_id) -> [roles avant la rafale, dernier membre reçu]
+        self._pending: Dict[Tuple[int, int], list] = {}
+        self._tasks = set()
+        bot.add_listener(self.on_member_update, "on_member_update")
+        bot.add_listener(self.on_uncached_member_update, "on_uncached_member_update")
+
+    def subscribe(self, handler: RoleChangeHandler):
+        if handler not in self._handlers:
+            self._handlers.append(handler)
+
+    def unsubscribe(self, handler: RoleChangeHandler):
+        if handler in self._handlers:
+            self._handlers.remove(handler)
+
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        key = (after.guild.id, after.id)
+        pending = self._pending.get(key)
+        if pending is not None:
+            pending[1] = after
+            return
+        if before._roles == after._roles:
+            return
+
+        self._schedule(key, role_ids(before), after)
+
+    async def on_uncached_member_update(self, member: discord.Member):
+        # Mode lean (utils/member_cache) : premier update d'un membre pas encore en cache
+        key = (member.guild.id, member.id)
+        pending = self._pending.get(key)
+        if pending is not None:
+            pending[0] = None
+            pending[1] = member
+            return
+        self._schedule(key, None, member)
+
+    def _schedule(self, key: Tuple[int, int], before_ids, member: discord.Member):
+        self._pending[key] = [before_ids, member]
+        task = asyncio.create_task(self._flush_later(key))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _flush_later(self, key: Tuple[int, int]):
+        await asyncio.sleep(self.window)
+        before_ids, member = self._pending.pop(key)
+        if before_ids is None:
+            change = RoleChange(member, frozenset(), frozenset(), partial=True)
+        else:
+            after_ids = role_ids(member)
+            change = RoleChange(member, after_ids - before_ids, before_ids - after_ids)
+            if not change.added and not change.removed:
+                return
+
+        handlers = list(self._handlers)
+        results = await asyncio.gather(*(handler(change) for handler in handlers), return_exceptions=True)
+        for handler, result in zip(handlers, results):
+            if isinstance(result, Exception):
+                log.error("Member update handler %s failed", getattr(handler, "__qualname__", handler), exc_info=result)
@@ -0,0 +1,310 @@
+import asyncio
+import contextvars
+import logging
+import os
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, Optional, Tuple
+
+from discord.ext import commands
+
+log = logging.getLogger("metrics")
+
+# --- Config (endpoint désactivé si METRICS_PORT vaut 0) ---
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+LOOP_LAG_INTERVAL = 0.5
+
+# Bornes des histogrammes de latence (secondes)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Route Discord en cours (lue par le filtre de logs 429 de discord.http)
+current_route: contextvars.ContextVar = contextvars.ContextVar("current_route", default=None)
+
+
+def escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(names: Tuple[str, ...], values: Tuple) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self.values: Dict[Tuple, float] = {}
+
+    def inc(self, *label_values, amount: float = 1.0):
+        self.values[label_values] = self.values.get(label_values, 0.0) + amount
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for values, count in self.values.items():
+            yield f"{self.name}{format_labels(self.labels, values)} {count}"
+
+
+class Gauge(Counter):
+    def set(self, value: float, *label_values):
+        self.values[label_values] = value
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} gauge"
+        for values, value in self.values.items():
+            yield f"{self.name}{format_labels(self.labels, values)} {value}"
+
+
+class Histogram:
+    # Compteurs par bucket non cumulés à l'observe (un bisect + 3 additions), cumulés au rendu
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self.series: Dict[Tuple, list] = {}  # labels -> [counts par bucket (+Inf), somme, nombre]
+
+    def observe(self, value: float, *label_values):
+        series = self.series.get(label_values)
+        if series is None:
+            series = self.series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        names = self.labels + ("le",)
+        for values, (counts, total, count) in self.series.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                yield f"{self.name}_bucket{format_labels(names, values + (le,))} {cumulative}"
+            yield f"{self.name}_sum{format_labels(self.labels, values)} {total}"
+            yield f"{self.name}_count{format_labels(self.labels, values)} {count}"
+
+
+# Commandes sans clé en premier argument (le label resterait sinon sans limite de valeurs)
+KEYLESS_COMMANDS = ("SCRIPT", "PING", "INFO", "CLIENT", "HELLO", "SELECT", "AUTH", "CONFIG", "FLUSH", "SCAN")
+
+
+def redis_key_prefix(args: tuple) -> str:
+    # "wallet:{g}:{u}" -> "wallet" ; pour EVAL/EVALSHA la première clé suit numkeys
+    if len(args) < 2:
+        return "-"
+    command = str(args[0]).upper()
+    if command.startswith(KEYLESS_COMMANDS):
+        return "-"
+    key = args[1]
+    if command in ("EVALSHA", "EVAL"):
+        key = args[3] if len(args) > 3 and str(args[2]) != "0" else "-"
+    return str(key).split(":", 1)[0]
+
+
+class RateLimitCounter(logging.Filter):
+    # discord.py gère les 429 lui-même et ne fait que logger : on compte ces warnings
+    def __init__(self, metrics: "Metrics"):
+        super().__init__()
+        self.metrics = metrics
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if isinstance(record.msg, str) and record.msg.startswith("We are being rate limited."):
+            route = current_route.get()
+            method, path = route if route else (str(record.args[0]), "unknown")
+            self.metrics.discord_429.inc(method, path)
+        return True
+
+
+class Metrics:
+    # Registre unique (bot.metrics) + instrumentation du bot et endpoint Prometheus optionnel
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.command_latency = Histogram(
+            "minah_command_duration_seconds", "Command execution time", ("command", "kind", "status"))
+        self.listener_latency = Histogram(
+            "minah_listener_duration_seconds", "Event listener execution time", ("event", "listener"))
+        self.gateway_events = Counter("minah_gateway_events_total", "Gateway events received, by type", ("event",))
+        self.redis_latency = Histogram(
+            "minah_redis_command_duration_seconds", "Redis command time by key prefix", ("command", "prefix", "status"))
+        self.discord_requests = Counter(
+            "minah_discord_requests_total", "Discord HTTP requests by route", ("method", "route", "status"))
+        self.discord_429 = Counter("minah_discord_ratelimited_total", "Discord HTTP 429 responses by route", ("method", "route"))
+        self.loop_lag = Histogram("minah_event_loop_lag_seconds", "Event loop scheduling lag")
+        self.loop_lag_last = Gauge("minah_event_loop_lag_last_seconds", "Last measured event loop lag")
+        self.cache = Gauge("minah_cache_size", "Discord cache sizes", ("cache",))
+        self.shard_latency = Gauge("minah_shard_latency_seconds", "Gateway heartbeat latency by shard", ("shard",))
+        self.shard_events = Counter("minah_shard_events_total", "Gateway events received by shard", ("shard",))
+        self.started = time.time()
+        self._server = None
+        self._lag_task = None
+
+    # --- Instrumentation ---
+    def install(self):
+        bot = self.bot
+        run_event = bot._run_event
+        tree_call = bot.tree._call
+        request = bot.http.request
+
+        async def timed_run_event(coro, event_name, *args, **kwargs):
+            started = time.perf_counter()
+            try:
+                await run_event(coro, event_name, *args, **kwargs)
+            finally:
+                self.listener_latency.observe(
+                    time.perf_counter() - started, event_name, getattr(coro, "__qualname__", "?"))
+
+        # ConnectionState garde sa propre référence à dispatch : on compte au niveau des parsers
+        # (un appel par payload reçu du gateway, même dict que celui utilisé par la websocket)
+        def counted(event, parse):
+            def parse_counted(data):
+                self.gateway_events.inc(event)
+                return parse(data)
+            return parse_counted
+
+        async def timed_tree_call(interaction):
+            started = time.perf_counter()
+            status = "ok"
+            try:
+                await tree_call(interaction)
+            except Exception:
+                status = "error"
+                raise
+            finally:
+                command = interaction.command.qualified_name if interaction.command else "component"
+                self.command_latency.observe(time.perf_counter() - started, command, "app", status)
+
+        async def counted_request(route, **kwargs):
+            key = (route.method, route.path)
+            token = current_route.set(key)
+            status = "error"
+            try:
+                result = await request(route, **kwargs)
+                status = "ok"
+                return result
+            except Exception as e:
+                status = str(getattr(e, "status", "error"))
+                raise
+            finally:
+                current_route.reset(token)
+                self.discord_requests.inc(route.method, route.path, status)
+
+        bot._run_event = timed_run_event
+        parsers = bot._connection.parsers
+        for event, parse in list(parsers.items()):
+            parsers[event] = counted(event, parse)
+        bot.tree._call = timed_tree_call
+        bot.http.request = counted_request
+        logging.getLogger("discord.http").addFilter(RateLimitCounter(self))
+
+        # Commandes préfixe (et hybrides invoquées en préfixe)
+        async def before_invoke(ctx: commands.Context):
+            ctx._metrics_started = time.perf_counter()
+
+        async def after_invoke(ctx: commands.Context):
+            started = getattr(ctx, "_metrics_started", None)
+            if started is not None and ctx.command:
+                status = "error" if ctx.command_failed else "ok"
+                self.command_latency.observe(time.perf_counter() - started, ctx.command.qualified_name, "prefix", status)
+
+        bot.before_invoke(before_invoke)
+        bot.after_invoke(after_invoke)
+
+    def observe_redis(self, args: tuple, seconds: float, error: bool):
+        self.redis_latency.observe(
+            seconds, str(args[0]).upper() if args else "?", redis_key_prefix(args), "error" if error else "ok")
+
+    # --- Event loop lag ---
+    async def _measure_lag(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + LOOP_LAG_INTERVAL
+            await asyncio.sleep(LOOP_LAG_INTERVAL)
+            lag = max(0.0, loop.time() - expected)
+            self.loop_lag.observe(lag)
+            self.loop_lag_last.set(lag)
+
+    # --- Rendu Prometheus ---
+    def collect_cache_sizes(self):
+        bot = self.bot
+        guilds = bot.guilds
+        self.cache.set(len(guilds), "guilds")
+        self.cache.set(sum(len(guild.members) for guild in guilds), "members")
+        self.cache.set(len(bot.users), "users")
+        self.cache.set(len(bot.cached_messages), "messages")
+
+    def collect_shards(self):
+        monitor = getattr(self.bot, "shard_monitor", None)
+        if monitor is None:
+            return
+        for shard_id, latency in monitor.latencies():
+            if latency == latency and latency != float("inf"):  # nan / inf tant que le shard n'est pas connecté
+                self.shard_latency.set(latency, str(shard_id))
+        for shard_id, count in monitor.events.items():
+            self.shard_events.values[(str(shard_id),)] = float(count)
+
+    def render(self) -> str:
+        self.collect_cache_sizes()
+        self.collect_shards()
+        lines = [
+            "# HELP minah_uptime_seconds Seconds since the metrics registry started",
+            "# TYPE minah_uptime_seconds gauge",
+            f"minah_uptime_seconds {time.time() - self.started}",
+        ]
+        for metric in (
+            self.command_latency, self.listener_latency, self.gateway_events, self.redis_latency,
+            self.discord_requests, self.discord_429, self.loop_lag, self.loop_lag_last, self.cache,
+            self.shard_latency, self.shard_events,
+        ):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> dict:
+        # Résumé compact pour le heartbeat
+        return {
+            "events": int(sum(self.gateway_events.values.values())),
+            "commands": sum(series[2] for series in self.command_latency.series.values()),
+            "discord_requests": int(sum(self.discord_requests.values.values())),
+            "discord_429": int(sum(self.discord_429.values.values())),
+            "loop_lag_ms": round(self.loop_lag_last.values.get((), 0.0) * 1000, 2),
+        }
+
+    # --- Endpoint HTTP ---
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+            while (await asyncio.wait_for(reader.readline(), timeout=5)) not in (b"\r\n", b"\n", b""):
+                pass
+            path = request_line.split()[1].decode() if len(request_line.split()) > 1 else "/"
+            if path.split("?", 1)[0] == "/metrics":
+                body = self.render().encode()
+                head = "HTTP/1.1 200 OK\r\nContent-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+            else:
+                body = b"not found\n"
+                head = "HTTP/1.1 404 Not Found\r\nContent-Type: text/plain\r\n"
+            writer.write(f"{head}Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = METRICS_HOST, port: Optional[int] = METRICS_PORT):
+        if self._lag_task is None:
+            self._lag_task = asyncio.create_task(self._measure_lag())
+        if port and self._server is None:
+            self._server = await asyncio.start_server(self._handle, host, port)
+            log.info("📈 Metrics endpoint on http://%s:%s/metrics", host, port)
+
+    async def close(self):
+        if self._lag_task:
+            self._lag_task.cancel()
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
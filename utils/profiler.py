@@ -0,0 +1,163 @@
+import asyncio
+import os
+import selectors
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from typing import List, NamedTuple, Optional
+
+# Rien n'est installé tant qu'aucun profil ne tourne (coût nul à l'arrêt)
+PROFILE_INTERVAL = 0.005      # période d'échantillonnage (secondes)
+SLOW_CALLBACK_THRESHOLD = 0.1  # blocage de la loop au-delà duquel on capture la pile
+LOOP_TICK = 0.01
+MAX_STACK_DEPTH = 64
+
+# Frames de la loop elle-même : gardées dans le profil brut, exclues des classements
+LOOP_INTERNALS = (os.path.dirname(asyncio.__file__), selectors.__file__)
+
+
+class SlowCallback(NamedTuple):
+    duration: float
+    stack: str  # pile de la loop au moment où le seuil a été dépassé
+
+
+class ProfileReport(NamedTuple):
+    duration: float
+    samples: int
+    idle: int                # échantillons où la loop attendait dans select()
+    cumulative: List[tuple]  # (fonction, échantillons)
+    own: List[tuple]
+    slow_callbacks: List[SlowCallback]
+    collapsed: str           # format "a;b;c N" (flamegraph.pl / speedscope)
+
+
+def frame_label(code) -> str:
+    path = code.co_filename
+    short = os.sep.join(path.split(os.sep)[-2:])
+    return f"{code.co_name} ({short}:{code.co_firstlineno})"
+
+
+class LoopProfiler:
+    # Thread d'échantillonnage de la pile du thread de la loop + détection des
+    # callbacks bloquants (la loop ne fait plus tourner son tick depuis > seuil).
+    def __init__(self, interval: float = PROFILE_INTERVAL, threshold: float = SLOW_CALLBACK_THRESHOLD):
+        self.interval = interval
+        self.threshold = threshold
+        self.stacks: Counter = Counter()
+        self.slow_callbacks: List[SlowCallback] = []
+        self._loop = None
+        self._loop_thread = None
+        self._tick_handle = None
+        self._last_tick = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _tick(self):
+        self._last_tick = time.monotonic()
+        self._tick_handle = self._loop.call_later(LOOP_TICK, self._tick)
+
+    def _sample(self, frame) -> tuple:
+        codes = []
+        while frame is not None and len(codes) < MAX_STACK_DEPTH:
+            codes.append(frame.f_code)
+            frame = frame.f_back
+        return tuple(reversed(codes))
+
+    def _run(self):
+        stall_started = None
+        stall_stack = None
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            self.stacks[self._sample(frame)] += 1
+
+            blocked = time.monotonic() - self._last_tick
+            if blocked > self.threshold + LOOP_TICK:
+                if stall_started is None:
+                    stall_started = self._last_tick
+                    stall_stack = "".join(traceback.format_stack(frame, limit=MAX_STACK_DEPTH))
+            elif stall_started is not None:
+                self.slow_callbacks.append(SlowCallback(self._last_tick - stall_started, stall_stack))
+                stall_started = None
+        if stall_started is not None:
+            self.slow_callbacks.append(SlowCallback(time.monotonic() - stall_started, stall_stack))
+
+    def start(self):
+        if self.running:
+            raise RuntimeError("profiler already running")
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self.stacks.clear()
+        self.slow_callbacks = []
+        self._stop.clear()
+        self._started = time.monotonic()
+        self._tick()
+        self._thread = threading.Thread(target=self._run, name="loop-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> ProfileReport:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self._thread = None
+        if self._tick_handle:
+            self._tick_handle.cancel()
+            self._tick_handle = None
+        return self.report(time.monotonic() - self._started)
+
+    async def profile(self, seconds: float) -> ProfileReport:
+        self.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            report = self.stop()
+        return report
+
+    def report(self, duration: float, top: int = 15) -> ProfileReport:
+        cumulative: Counter = Counter()
+        own: Counter = Counter()
+        idle = 0
+        lines = []
+        for stack, count in self.stacks.items():
+            lines.append(f"{';'.join(frame_label(code) for code in stack)} {count}")
+            if stack and stack[-1].co_filename == selectors.__file__:
+                idle += count
+                continue
+            labels = [frame_label(code) for code in stack if not code.co_filename.startswith(LOOP_INTERNALS)]
+            for label in set(labels):
+                cumulative[label] += count
+            if labels:
+                own[labels[-1]] += count
+        return ProfileReport(
+            duration=duration,
+            samples=sum(self.stacks.values()),
+            idle=idle,
+            cumulative=cumulative.most_common(top),
+            own=own.most_common(top),
+            slow_callbacks=sorted(self.slow_callbacks, key=lambda s: s.duration, reverse=True),
+            collapsed="\n".join(sorted(lines)) + "\n",
+        )
+
+
+def format_report(report: ProfileReport, limit: int = 10) -> str:
+    total = max(report.samples, 1)
+    out = [
+        f"{report.samples} samples in {report.duration:.1f}s, loop idle {report.idle / total:.1%}",
+        "", "Top cumulative:",
+    ]
+    out += [f"{count / total:6.1%}  {label}" for label, count in report.cumulative[:limit]]
+    out += ["", "Top self:"]
+    out += [f"{count / total:6.1%}  {label}" for label, count in report.own[:limit]]
+    out += ["", f"Slow callbacks: {len(report.slow_callbacks)}"]
+    for slow in report.slow_callbacks[:3]:
+        last = slow.stack.strip().splitlines()[-2:] if slow.stack else []
+        out.append(f"  {slow.duration * 1000:.0f} ms at {' / '.join(line.strip() for line in last)}")
+    return "\n".join(out)
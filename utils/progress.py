@@ -0,0 +1,31 @@
+import logging
+import time
+
+import discord
+
+log = logging.getLogger("progress")
+
+PROGRESS_EDIT_INTERVAL = 3.0
+
+
+class ProgressMessage:
+    # Un seul message de progression, édité sur place au plus toutes les N secondes
+    def __init__(self, channel: discord.abc.Messageable, interval: float = PROGRESS_EDIT_INTERVAL, message=None):
+        self.channel = channel
+        self.interval = interval
+        # message existant (ex: job repris après redémarrage) : édité au lieu d'en envoyer un nouveau
+        self.message = message
+        self._last_edit = 0.0
+
+    async def update(self, content: str, force: bool = False):
+        now = time.monotonic()
+        if not force and self.message is not None and now - self._last_edit < self.interval:
+            return
+        self._last_edit = now
+        try:
+            if self.message is None:
+                self.message = await self.channel.send(content)
+            else:
+                await self.message.edit(content=content)
+        except discord.HTTPException:
+            log.warning("Could not update progress message")
@@ -0,0 +1,183 @@
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+
+import redis.asyncio as redis
+from redis.asyncio.client import Pipeline
+from discord.ext import commands
+
+log = logging.getLogger("redis")
+
+REDIS_POOL_SIZE = int(os.getenv("REDIS_POOL_SIZE", "20"))
+REDIS_HEALTH_INTERVAL = float(os.getenv("REDIS_HEALTH_INTERVAL", "15"))
+REDIS_BACKOFF_MAX = 60.0
+
+
+class LatencyStats:
+    # Fenêtre glissante des dernières latences (secondes)
+    def __init__(self, window: int = 512):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.errors = 0
+
+    def record(self, seconds: float, error: bool = False):
+        self.samples.append(seconds)
+        self.count += 1
+        if error:
+            self.errors += 1
+
+    def percentile(self, pct: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+class InstrumentedRedis(redis.Redis):
+    # Chronomètre chaque commande ; metrics (bot.metrics) ajoute le détail par préfixe de clé
+    latency: LatencyStats = None
+    metrics = None
+
+    async def execute_command(self, *args, **options):
+        started = time.perf_counter()
+        error = False
+        try:
+            return await super().execute_command(*args, **options)
+        except Exception:
+            error = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            if self.latency is not None:
+                self.latency.record(elapsed, error)
+            if self.metrics is not None:
+                self.metrics.observe_redis(args, elapsed, error)
+
+    def pipeline(self, transaction: bool = True, shard_hint=None) -> "InstrumentedPipeline":
+        pipe = InstrumentedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+        pipe.latency = self.latency
+        pipe.metrics = self.metrics
+        return pipe
+
+
+class InstrumentedPipeline(Pipeline):
+    # Un pipeline = un aller-retour, étiqueté MULTI/PIPELINE + préfixe de la première clé
+    latency: LatencyStats = None
+    metrics = None
+
+    async def execute(self, raise_on_error: bool = True):
+        first = self.command_stack[0][0] if self.command_stack else ()
+        started = time.perf_counter()
+        error = False
+        try:
+            return await super().execute(raise_on_error)
+        except Exception:
+            error = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            if self.latency is not None:
+                self.latency.record(elapsed, error)
+            if self.metrics is not None and first:
+                label = "MULTI" if self.is_transaction else "PIPELINE"
+                self.metrics.observe_redis((label,) + tuple(first[1:2]), elapsed, error)
+
+
+class RedisManager:
+    # Un seul pool pour tout le bot. bot.redis pointe vers le client quand Redis
+    # répond, None sinon ; le health check le remet en place après une coupure.
+    def __init__(
+        self,
+        bot: commands.Bot,
+        url: str,
+        pool_size: int = REDIS_POOL_SIZE,
+        health_interval: float = REDIS_HEALTH_INTERVAL,
+    ):
+        self.bot = bot
+        self.url = url
+        self.health_interval = health_interval
+        self.latency = LatencyStats()
+        # ConnectionPool simple : le BlockingConnectionPool de redis 5.0.1 se bloque
+        # jusqu'au timeout quand la connexion au serveur échoue
+        self.pool = redis.ConnectionPool.from_url(url, max_connections=pool_size, decode_responses=True)
+        self.client = InstrumentedRedis(connection_pool=self.pool)
+        self.client.latency = self.latency
+        self.client.metrics = getattr(bot, "metrics", None)
+        self.healthy = False
+        self.failures = 0
+        self.last_ping = None
+        self._task = None
+
+    async def ping(self) -> bool:
+        started = time.perf_counter()
+        try:
+            await self.client.ping()
+        except Exception as e:
+            self._mark_down(e)
+            return False
+        self.last_ping = time.perf_counter() - started
+        self._mark_up()
+        return True
+
+    def _mark_up(self):
+        if not self.healthy:
+            kwargs = self.pool.connection_kwargs
+            log.info("✅ Redis available at %s:%s", kwargs.get("host"), kwargs.get("port"))
+        self.healthy = True
+        self.failures = 0
+        self.bot.redis = self.client
+
+    def _mark_down(self, error: Exception):
+        if self.healthy or self.failures == 0:
+            log.error("❌ Redis unavailable: %s", error)
+        self.healthy = False
+        self.failures += 1
+        self.bot.redis = None
+
+    async def connect(self) -> bool:
+        ok = await self.ping()
+        self.start()
+        return ok
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._health_loop())
+
+    async def _health_loop(self):
+        while True:
+            if self.healthy:
+                delay = self.health_interval
+            else:
+                # Backoff exponentiel tant que Redis ne répond pas
+                delay = min(REDIS_BACKOFF_MAX, 2 ** min(self.failures, 6))
+            await asyncio.sleep(delay)
+
+            was_healthy = self.healthy
+            if not await self.ping() and was_healthy:
+                # Connexions probablement mortes : on repart d'un pool propre
+                try:
+                    await self.pool.disconnect(inuse_connections=False)
+                except Exception:
+                    log.exception("Failed to reset Redis pool")
+
+    def stats(self) -> dict:
+        return {
+            "healthy": self.healthy,
+            "failures": self.failures,
+            "in_use": len(self.pool._in_use_connections),
+            "idle": len(self.pool._available_connections),
+            "max": self.pool.max_connections,
+            "commands": self.latency.count,
+            "errors": self.latency.errors,
+            "p50_ms": round(self.latency.percentile(0.5) * 1000, 2),
+            "p99_ms": round(self.latency.percentile(0.99) * 1000, 2),
+            "ping_ms": round(self.last_ping * 1000, 2) if self.last_ping is not None else None,
+        }
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+        await self.client.aclose()
+        await self.pool.disconnect()
@@ -0,0 +1,113 @@
+import asyncio
+import logging
+import time
+from typing import Callable, Iterable, NamedTuple, Optional, Tuple
+
+import discord
+from discord.http import Route
+
+log = logging.getLogger("role-scheduler")
+
+ROLE_ROUTE = "/guilds/{guild_id}/members/{user_id}/roles/{role_id}"
+
+# Jeton(s) gardés en réserve pour les changements de rôles "live" (events)
+RESERVED_TOKENS = 1
+# Pacing prudent si l'état du bucket est illisible (API interne de discord.py modifiée)
+FALLBACK_INTERVAL = 1.0
+MAX_429_RETRIES = 3
+
+
+class MutationReport(NamedTuple):
+    applied: int
+    failed: int
+    duration: float
+    waited: float  # temps passé à attendre le bucket
+
+
+class RoleMutationScheduler:
+    # File de changements de rôles, un verrou par serveur. Avant chaque appel on lit
+    # le bucket de rate limit tenu par discord.py (remaining / reset) : on enchaîne
+    # tant qu'il reste du budget et on attend le reset quand il est épuisé.
+    def __init__(self, bot: discord.Client):
+        self.bot = bot
+        self._locks = {}
+        self.waited = 0.0
+
+    def _lock(self, guild_id: int) -> asyncio.Lock:
+        if guild_id not in self._locks:
+            self._locks[guild_id] = asyncio.Lock()
+        return self._locks[guild_id]
+
+    def bucket(self, method: str, guild_id: int):
+        http = self.bot.http
+        try:
+            route = Route(method, ROLE_ROUTE, guild_id=guild_id, user_id=0, role_id=0)
+            bucket_hash = http._bucket_hashes.get(route.key)
+            buckets = http._buckets
+        except AttributeError:
+            return None
+        if bucket_hash is None:
+            return buckets.get(f"{route.key}:{route.major_parameters}")
+        return buckets.get(f"{bucket_hash}:{route.major_parameters}") or buckets.get(bucket_hash + route.major_parameters)
+
+    async def _wait_for_budget(self, method: str, guild_id: int):
+        ratelimit = self.bucket(method, guild_id)
+        if ratelimit is None:
+            return
+        remaining = getattr(ratelimit, "remaining", None)
+        if remaining is None:
+            await asyncio.sleep(FALLBACK_INTERVAL)
+            self.waited += FALLBACK_INTERVAL
+            return
+        if remaining - getattr(ratelimit, "outgoing", 0) > RESERVED_TOKENS:
+            return
+
+        expires = getattr(ratelimit, "expires", None)
+        if expires is not None:
+            delay = expires - asyncio.get_running_loop().time()
+        else:
+            delay = getattr(ratelimit, "reset_after", FALLBACK_INTERVAL)
+        if delay > 0:
+            await asyncio.sleep(delay)
+            self.waited += delay
+
+    async def mutate(self, member: discord.Member, role: discord.Role, grant: bool, reason: str = None):
+        method = "PUT" if grant else "DELETE"
+        async with self._lock(member.guild.id):
+            for attempt in range(MAX_429_RETRIES + 1):
+                await self._wait_for_budget(method, member.guild.id)
+                try:
+                    if grant:
+                        await member.add_roles(role, reason=reason)
+                    else:
+                        await member.remove_roles(role, reason=reason)
+                    return
+                except discord.HTTPException as e:
+                    if e.status != 429 or attempt == MAX_429_RETRIES:
+                        raise
+                    delay = 2 ** attempt
+                    log.warning("429 on role change for %s, retrying in %ss", member, delay)
+                    await asyncio.sleep(delay)
+
+    async def run(
+        self,
+        mutations: Iterable[Tuple[discord.Member, discord.Role, bool, str]],
+        on_result: Optional[Callable] = None,
+    ) -> MutationReport:
+        # on_result(member, grant, ok) est appelé après chaque mutation
+        applied = 0
+        failed = 0
+        started = time.perf_counter()
+        waited_before = self.waited
+        for member, role, grant, reason in mutations:
+            try:
+                await self.mutate(member, role, grant, reason)
+                applied += 1
+                ok = True
+            except discord.HTTPException as e:
+                log.error("❌ Role change failed for %s: %s", member, e)
+                failed += 1
+                ok = False
+            if on_result:
+                await on_result(member, grant, ok)
+        return MutationReport(applied, failed, time.perf_counter() - started, self.waited - waited_before)
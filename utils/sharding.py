@@ -0,0 +1,172 @@
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Coroutine, Dict, List, Optional
+
+import discord
+from discord.ext import commands
+
+log = logging.getLogger("sharding")
+
+# --- Config ---
+# SHARD_MODE=auto : AutoShardedBot (plusieurs connexions gateway dans le même process)
+# SHARD_COUNT     : nombre total de shards (vide = recommandé par Discord)
+# SHARD_IDS       : shards lancés par ce process, ex "0,1" (nécessite SHARD_COUNT)
+SHARD_MODE = os.getenv("SHARD_MODE", "off").lower()
+SHARD_COUNT = int(os.getenv("SHARD_COUNT", "0")) or None
+SHARD_IDS = [int(x) for x in os.getenv("SHARD_IDS", "").split(",") if x.strip()] or None
+# Jobs par serveur (rappels, scans AutoRole, payouts) exécutés en même temps sur un shard
+SHARD_JOB_CONCURRENCY = int(os.getenv("SHARD_JOB_CONCURRENCY", "2"))
+
+
+def is_sharded() -> bool:
+    return SHARD_MODE == "auto"
+
+
+def bot_class():
+    return commands.AutoShardedBot if is_sharded() else commands.Bot
+
+
+def shard_options() -> dict:
+    if not is_sharded():
+        return {}
+    options = {}
+    if SHARD_COUNT:
+        options["shard_count"] = SHARD_COUNT
+    if SHARD_IDS:
+        options["shard_ids"] = SHARD_IDS
+    return options
+
+
+def shard_of(guild_id: int, shard_count: Optional[int]) -> int:
+    # Formule Discord : (guild_id >> 22) % shard_count
+    return (guild_id >> 22) % (shard_count or 1)
+
+
+class ShardScheduler:
+    # bot.shard_jobs : une file par shard (SHARD_JOB_CONCURRENCY jobs à la fois).
+    # Un shard chargé (gros scan AutoRole...) ne retarde pas les jobs des autres shards.
+    def __init__(self, bot: commands.Bot, concurrency: int = SHARD_JOB_CONCURRENCY):
+        self.bot = bot
+        self.concurrency = concurrency
+        self._lanes: Dict[int, asyncio.Semaphore] = {}
+        # shard -> [en cours, en attente, terminés, secondes de travail]
+        self.stats: Dict[int, list] = {}
+
+    def shard_id(self, guild: discord.abc.Snowflake) -> int:
+        shard_id = getattr(guild, "shard_id", None)
+        if shard_id is None:
+            shard_id = shard_of(guild.id, getattr(self.bot, "shard_count", None))
+        return shard_id
+
+    @asynccontextmanager
+    async def lane(self, guild: discord.abc.Snowflake, name: str):
+        shard_id = self.shard_id(guild)
+        lane = self._lanes.get(shard_id)
+        if lane is None:
+            lane = self._lanes[shard_id] = asyncio.Semaphore(self.concurrency)
+        stats = self.stats.setdefault(shard_id, [0, 0, 0, 0.0])
+
+        if lane.locked():
+            log.info("⏳ Job %s for guild %s queued on shard %s", name, guild.id, shard_id)
+        stats[1] += 1
+        try:
+            await lane.acquire()
+        finally:
+            stats[1] -= 1
+
+        stats[0] += 1
+        started = time.perf_counter()
+        try:
+            yield shard_id
+        finally:
+            elapsed = time.perf_counter() - started
+            stats[0] -= 1
+            stats[2] += 1
+            stats[3] += elapsed
+            lane.release()
+            log.debug("Job %s for guild %s done on shard %s in %.1fs", name, guild.id, shard_id, elapsed)
+
+    async def run(self, guild: discord.abc.Snowflake, name: str, coro: Coroutine):
+        try:
+            async with self.lane(guild, name):
+                return await coro
+        finally:
+            coro.close()  # jamais démarrée si annulée dans la file (évite "never awaited")
+
+
+class ShardMonitor:
+    # bot.shard_monitor : events gateway par shard (shard déduit du guild_id du payload,
+    # shard 0 pour les events sans serveur, comme les DMs) + latence de chaque connexion.
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.events: Dict[int, int] = {}
+        self._last_events: Dict[int, int] = {}
+        self._last_report = time.monotonic()
+
+    def install(self):
+        state = self.bot._connection
+        events = self.events
+
+        def counted(parse):
+            def parse_counted(data):
+                guild_id = data.get("guild_id") if isinstance(data, dict) else None
+                shard_id = shard_of(int(guild_id), self.bot.shard_count) if guild_id else 0
+                events[shard_id] = events.get(shard_id, 0) + 1
+                return parse(data)
+            return parse_counted
+
+        for event, parse in list(state.parsers.items()):
+            state.parsers[event] = counted(parse)
+
+        self.bot.add_listener(self.on_shard_connect, "on_shard_connect")
+        self.bot.add_listener(self.on_shard_disconnect, "on_shard_disconnect")
+        self.bot.add_listener(self.on_shard_resumed, "on_shard_resumed")
+
+    async def on_shard_connect(self, shard_id: int):
+        log.info("🔌 Shard %s connected", shard_id)
+
+    async def on_shard_disconnect(self, shard_id: int):
+        log.warning("⚠️ Shard %s disconnected", shard_id)
+
+    async def on_shard_resumed(self, shard_id: int):
+        log.info("🔁 Shard %s resumed", shard_id)
+
+    def latencies(self) -> List[tuple]:
+        latencies = getattr(self.bot, "latencies", None)
+        if latencies is not None:
+            return list(latencies)
+        return [(0, self.bot.latency)]
+
+    def guild_counts(self) -> Dict[int, int]:
+        counts: Dict[int, int] = {}
+        for guild in self.bot.guilds:
+            shard_id = guild.shard_id
+            counts[shard_id] = counts.get(shard_id, 0) + 1
+        return counts
+
+    def report(self) -> List[dict]:
+        # Une ligne par shard ; events/s calculé depuis l'appel précédent
+        now = time.monotonic()
+        elapsed = max(now - self._last_report, 1e-9)
+        guilds = self.guild_counts()
+        jobs = getattr(getattr(self.bot, "shard_jobs", None), "stats", {})
+        rows = []
+        for shard_id, latency in sorted(self.latencies()):
+            count = self.events.get(shard_id, 0)
+            running, queued, done, busy = jobs.get(shard_id, (0, 0, 0, 0.0))
+            rows.append({
+                "shard": shard_id,
+                "latency_ms": round(latency * 1000, 1) if latency == latency and latency != float("inf") else None,
+                "events_per_s": round((count - self._last_events.get(shard_id, 0)) / elapsed, 2),
+                "guilds": guilds.get(shard_id, 0),
+                "jobs_running": running,
+                "jobs_queued": queued,
+                "jobs_done": done,
+                "jobs_busy_s": round(busy, 1),
+            })
+        self._last_events = dict(self.events)
+        self._last_report = now
+        return rows
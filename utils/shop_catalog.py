@@ -0,0 +1,105 @@
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import discord
+
+# --- Effets de rachat ---
+EFFECT_ROLE = "role"            # target = role id
+EFFECT_TICKET = "ticket"        # target = champ du wallet (tickets / skip_tickets)
+EFFECT_CARD_PING = "card_ping"  # target = user id à ping dans le salon
+
+
+class Category(NamedTuple):
+    id: str
+    label: str
+    description: str
+    emoji: str
+
+
+class CatalogItem(NamedTuple):
+    id: str
+    category: str
+    label: str
+    emoji: str
+    price: int
+    blurb: str
+    effect: str
+    target: object
+
+
+# --- Catalogue Lilac Shop ---
+# Ajouter un item = ajouter une ligne ici (aucune nouvelle branche de code).
+CATEGORIES = (
+    Category("role", "Discord Role", "Special server roles", "🌸"),
+    Category("ticket", "Auction Ticket", "Bid in auctions", "🎟️"),
+    Category("card", "Cards", "Collectible cards", "🃏"),
+)
+
+ITEMS = (
+    CatalogItem("snorlax", "role", "Snorlax", "🌸", 50,
+                "Special server role with cozy vibes.", EFFECT_ROLE, 1447310242911359109),
+    CatalogItem("normal_ticket", "ticket", "Normal Queue Auction Ticket", "🎟️", 10,
+                "Join the standard auction queue.", EFFECT_TICKET, "tickets"),
+    CatalogItem("skip_ticket", "ticket", "Skip Queue Auction Ticket", "🚀", 25,
+                "Jump ahead in the auction queue for priority bidding.", EFFECT_TICKET, "skip_tickets"),
+    CatalogItem("ex_minah", "card", "EX Minah vCM", "✨", 20,
+                "Exclusive collectible card.", EFFECT_CARD_PING, 723441401211256842),
+    CatalogItem("ur_ruman", "card", "UR Ruman AFK vCM", "💎", 35,
+                "Ultra rare collectible card.", EFFECT_CARD_PING, 723441401211256842),
+)
+
+SHOP_COLOR = discord.Color.purple()
+
+
+class Catalog:
+    # Construit une seule fois : index, options de Select et embeds "modèles"
+    # (sans les champs du wallet, patchés à chaque clic).
+    def __init__(self, categories: Tuple[Category, ...], items: Tuple[CatalogItem, ...]):
+        self.categories: Dict[str, Category] = {c.id: c for c in categories}
+        self.items: Dict[str, CatalogItem] = {i.id: i for i in items}
+        self.by_category: Dict[str, List[CatalogItem]] = {c.id: [] for c in categories}
+        for item in items:
+            self.by_category[item.category].append(item)
+
+        self.category_options = [
+            discord.SelectOption(label=c.label, value=c.id, description=c.description, emoji=c.emoji)
+            for c in categories
+        ]
+        self.item_options = {
+            cid: [
+                discord.SelectOption(label=i.label, value=i.id, description=f"{i.price} petals", emoji=i.emoji)
+                for i in cat_items
+            ]
+            for cid, cat_items in self.by_category.items()
+        }
+
+        categories_text = "\n".join(f"{c.emoji} {c.label}" for c in categories)
+        self.home_embed = self._template(
+            "Select a category from the dropdown below.", [("Categories", categories_text)]
+        )
+        self.category_embeds = {
+            cid: self._template(
+                f"{self.categories[cid].label} — items",
+                [("Items", "\n\n".join(f"{i.emoji} {i.label} — {i.price} petals\n*{i.blurb}*" for i in cat_items))],
+            )
+            for cid, cat_items in self.by_category.items()
+        }
+        self.item_embeds = {
+            iid: self._template("Select a category from the dropdown below.", [("Selected item", f"✅ {i.label}")])
+            for iid, i in self.items.items()
+        }
+        self.purchase_embed = self._template(
+            "Purchase complete ✅", [("Tip", "Use Back to continue shopping.")], discord.Color.green()
+        )
+
+    @staticmethod
+    def _template(description: str, fields, color: discord.Color = SHOP_COLOR) -> dict:
+        embed = discord.Embed(title="🌸 Lilac Shop", description=description, color=color)
+        for name, value in fields:
+            embed.add_field(name=name, value=value, inline=False)
+        return embed.to_dict()
+
+    def get(self, item_id: str) -> Optional[CatalogItem]:
+        return self.items.get(item_id)
+
+
+catalog = Catalog(CATEGORIES, ITEMS)
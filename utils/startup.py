@@ -0,0 +1,106 @@
+import asyncio
+import glob
+import hashlib
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import List, Tuple
+
+from discord.ext import commands
+
+log = logging.getLogger("startup")
+
+# Hash de l'arbre de commandes globales au dernier sync réussi
+TREE_HASH_KEY = "commands:tree-hash:{application_id}"
+FORCE_COMMAND_SYNC = os.getenv("FORCE_COMMAND_SYNC", "0") == "1"
+
+
+class StartupTimer:
+    # Durée de chaque phase du démarrage, affichée une fois le bot prêt
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: List[Tuple[str, float]] = []
+        self.is_ready = False
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - started))
+
+    def record(self, name: str, seconds: float):
+        self.phases.append((name, seconds))
+
+    def ready(self):
+        # Premier on_ready uniquement (les reconnexions redéclenchent l'event)
+        if self.is_ready:
+            return
+        self.is_ready = True
+        self.record("ready (since launch)", time.perf_counter() - self.started)
+        self.log_summary()
+
+    def log_summary(self):
+        log.info("⏱️ Startup breakdown (%.2fs since launch):", time.perf_counter() - self.started)
+        for name, seconds in self.phases:
+            log.info("   %-28s %7.3fs", name, seconds)
+
+
+# --- Cogs ---
+async def load_cogs(bot: commands.Bot, timer: StartupTimer, pattern: str = "cogs/*.py"):
+    # Les cogs sont indépendants (état partagé créé avant dans setup_hook) : chargement concurrent
+    async def load(cog_name: str):
+        started = time.perf_counter()
+        try:
+            await bot.load_extension(cog_name)
+            status = "✅"
+        except Exception as e:
+            status = f"❌ ({type(e).__name__})"
+            log.exception("❌ Failed to load cog %s", cog_name, exc_info=e)
+        timer.record(f"cog {cog_name}", time.perf_counter() - started)
+        return cog_name, status
+
+    names = sorted(file.replace("/", ".").replace("\\", ".")[:-3] for file in glob.glob(pattern))  # ex: cogs.admin
+    with timer.phase("cogs (total)"):
+        return await asyncio.gather(*(load(name) for name in names))
+
+
+# --- Command sync ---
+def tree_hash(bot: commands.Bot) -> str:
+    # Payload envoyé par tree.sync() pour les commandes globales, trié -> hash stable
+    payload = sorted(
+        (command.to_dict(bot.tree) for command in bot.tree.get_commands(guild=None)),
+        key=lambda data: (data.get("type", 1), data["name"]),
+    )
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+async def record_sync(bot: commands.Bot, digest: str = None):
+    if bot.redis is None:
+        return
+    try:
+        await bot.redis.set(TREE_HASH_KEY.format(application_id=bot.application_id), digest or tree_hash(bot))
+    except Exception:
+        log.exception("Could not store command tree hash")
+
+
+async def sync_if_changed(bot: commands.Bot, force: bool = FORCE_COMMAND_SYNC):
+    digest = tree_hash(bot)
+    stored = None
+    if bot.redis is not None and not force:
+        try:
+            stored = await bot.redis.get(TREE_HASH_KEY.format(application_id=bot.application_id))
+        except Exception:
+            log.exception("Could not read command tree hash, syncing")
+
+    if stored == digest:
+        log.info("🌍 Global slash commands unchanged (%s), sync skipped", digest[:12])
+        return None
+
+    synced = await bot.tree.sync()
+    await record_sync(bot, digest)
+    log.info("🌍 Global slash commands synced (%s commandes, %s)", len(synced), digest[:12])
+    return synced
@@ -0,0 +1,393 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from discord.ext import commands
+
+log = logging.getLogger("wallet")
+
+# --- Layout ---
+# Un hash par membre et par serveur : wallet:{guild_id}:{user_id}
+# Quelques petits champs -> encodage listpack compact côté Redis.
+CURRENCIES = ("petals", "tickets", "skip_tickets")
+
+# Ancien format (1 clé string par devise, sans serveur ni type de ticket).
+# Toujours lu pendant la migration, uniquement pour le serveur historique.
+LEGACY_GUILD_ID = int(os.getenv("WALLET_LEGACY_GUILD_ID", "1293611593845706793"))
+LEGACY_KEYS = {
+    "petals": "petals",
+    "tickets": "tickets",  # normal et skip confondus -> ticket normal
+}
+
+# Durée de vie (secondes) des snapshots de portefeuille utilisés par l'UI du shop
+SNAPSHOT_TTL = 5.0
+SNAPSHOT_MAX_USERS = 2000
+
+# Nombre de clés par itération SCAN pendant la migration
+MIGRATION_BATCH_SIZE = 500
+
+# --- Ledger ---
+# Un stream par membre et par serveur : ledger:{guild_id}:{user_id}, écrit dans le même script
+# que le solde. Une entrée par mutation : {devise: delta..., r: raison, a: auteur}
+# (a absent = action du bot). Taille bornée à ~LEDGER_MAXLEN entrées par membre (trim approximatif).
+LEDGER_MAXLEN = int(os.getenv("LEDGER_MAXLEN", "200"))
+HISTORY_PAGE_SIZE = 10
+
+# Applique N deltas en une seule étape côté serveur.
+# KEYS = 4 clés par portefeuille : hash, ancienne clé petals, ancienne clé tickets, ledger.
+# ARGV = raison, auteur ('' = le bot), LEDGER_MAXLEN, puis par portefeuille :
+# legacy (0/1), nb de champs, puis (champ, delta)...
+# Les anciennes clés sont d'abord repliées dans le hash (migration à la volée).
+# Si un delta négatif ferait passer un solde sous 0, rien n'est écrit et
+# le script renvoie {0, soldes actuels...}; sinon {1, nouveaux soldes...}.
+APPLY_SCRIPT = """
+local plan = {}
+local entries = {}
+local ok = 1
+local pos = 4
+for w = 1, #KEYS / 4 do
+    local hash = KEYS[4 * w - 3]
+    if ARGV[pos] == '1' then
+        local legacy = {KEYS[4 * w - 2], 'petals', KEYS[4 * w - 1], 'tickets'}
+        for i = 1, #legacy, 2 do
+            local val = redis.call('GET', legacy[i])
+            if val then
+                redis.call('HINCRBY', hash, legacy[i + 1], val)
+                redis.call('DEL', legacy[i])
+            end
+        end
+    end
+    local n = tonumber(ARGV[pos + 1])
+    local entry = {}
+    pos = pos + 2
+    for i = 1, n do
+        local field, delta = ARGV[pos], tonumber(ARGV[pos + 1])
+        local current = tonumber(redis.call('HGET', hash, field) or '0')
+        if delta < 0 and current + delta < 0 then
+            ok = 0
+        end
+        plan[#plan + 1] = {hash, field, delta, current}
+        entry[#entry + 1] = field
+        entry[#entry + 1] = ARGV[pos + 1]
+        pos = pos + 2
+    end
+    entries[#entries + 1] = {KEYS[4 * w], entry}
+end
+local out = {ok}
+for i = 1, #plan do
+    if ok == 1 then
+        out[i + 1] = redis.call('HINCRBY', plan[i][1], plan[i][2], plan[i][3])
+    else
+        out[i + 1] = plan[i][4]
+    end
+end
+if ok == 1 then
+    for i = 1, #entries do
+        local entry = entries[i][2]
+        entry[#entry + 1] = 'r'
+        entry[#entry + 1] = ARGV[1]
+        if ARGV[2] ~= '' then
+            entry[#entry + 1] = 'a'
+            entry[#entry + 1] = ARGV[2]
+        end
+        redis.call('XADD', entries[i][1], 'MAXLEN', '~', ARGV[3], '*', unpack(entry))
+    end
+end
+return out
+"""
+
+# KEYS = paires (ancienne clé, hash), ARGV = champ cible de chaque paire.
+MIGRATE_SCRIPT = """
+local moved = 0
+for i = 1, #ARGV do
+    local val = redis.call('GET', KEYS[2 * i - 1])
+    if val then
+        redis.call('HINCRBY', KEYS[2 * i], ARGV[i], val)
+        redis.call('DEL', KEYS[2 * i - 1])
+        moved = moved + 1
+    end
+end
+return moved
+"""
+
+
+# Crédit idempotent par membre (jobs reprenables) : KEYS[1] = set des membres déjà crédités,
+# puis 2 clés par membre : hash du portefeuille, ledger. ARGV = raison, auteur, LEDGER_MAXLEN,
+# puis par membre : user_id, nb de champs, (champ, delta)...
+# Un membre déjà présent dans le set est sauté ; renvoie les user_ids crédités.
+CREDIT_ONCE_SCRIPT = """
+local credited = {}
+local pos = 4
+for w = 2, #KEYS, 2 do
+    local user_id, n = ARGV[pos], tonumber(ARGV[pos + 1])
+    pos = pos + 2
+    if redis.call('SADD', KEYS[1], user_id) == 1 then
+        local entry = {}
+        for i = 1, n do
+            redis.call('HINCRBY', KEYS[w], ARGV[pos], ARGV[pos + 1])
+            entry[#entry + 1] = ARGV[pos]
+            entry[#entry + 1] = ARGV[pos + 1]
+            pos = pos + 2
+        end
+        entry[#entry + 1] = 'r'
+        entry[#entry + 1] = ARGV[1]
+        if ARGV[2] ~= '' then
+            entry[#entry + 1] = 'a'
+            entry[#entry + 1] = ARGV[2]
+        end
+        redis.call('XADD', KEYS[w + 1], 'MAXLEN', '~', ARGV[3], '*', unpack(entry))
+        credited[#credited + 1] = user_id
+    else
+        pos = pos + 2 * n
+    end
+end
+return credited
+"""
+
+
+class WalletResult(NamedTuple):
+    ok: bool
+    balances: Dict[Tuple[int, str], int]
+
+    def of(self, user_id: int) -> Dict[str, int]:
+        return {cur: val for (uid, cur), val in self.balances.items() if uid == user_id}
+
+
+class LedgerEntry(NamedTuple):
+    id: str  # id du stream : "<ms>-<seq>", sert aussi de curseur de pagination
+    deltas: Dict[str, int]
+    reason: str
+    actor: Optional[int]
+
+    @property
+    def timestamp(self) -> int:
+        return int(self.id.split("-", 1)[0]) // 1000
+
+    @classmethod
+    def from_stream(cls, entry_id: str, fields: Dict[str, str]) -> "LedgerEntry":
+        deltas = {cur: int(fields[cur]) for cur in CURRENCIES if cur in fields}
+        actor = fields.get("a")
+        return cls(entry_id, deltas, fields.get("r", ""), int(actor) if actor else None)
+
+
+def wallet_key(guild_id: int, user_id: int) -> str:
+    return f"wallet:{guild_id}:{user_id}"
+
+
+def legacy_key(user_id: int, currency: str) -> str:
+    return f"{LEGACY_KEYS[currency]}:{user_id}"
+
+
+def ledger_key(guild_id: int, user_id: int) -> str:
+    return f"ledger:{guild_id}:{user_id}"
+
+
+class Wallet:
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self._scripts = {}
+        self._script_client = None
+        # (guild_id, user_id) -> (expires_at, {currency: balance})
+        self._snapshots: Dict[Tuple[int, int], Tuple[float, Dict[str, int]]] = {}
+
+    @property
+    def redis(self):
+        return getattr(self.bot, "redis", None)
+
+    def _script(self, source: str):
+        # Les scripts sont liés au client : on les ré-enregistre si bot.redis change
+        client = self.redis
+        if not client:
+            raise RuntimeError("Redis is unavailable")
+        if self._script_client is not client:
+            self._scripts = {}
+            self._script_client = client
+        if source not in self._scripts:
+            self._scripts[source] = client.register_script(source)
+        return self._scripts[source]
+
+    # --- Reads ---
+    async def get_all(self, guild_id: int, user_id: int) -> Dict[str, int]:
+        # Tout le portefeuille en un seul aller-retour (+ anciennes clés si besoin)
+        if not self.redis:
+            return {cur: 0 for cur in CURRENCIES}
+
+        legacy = guild_id == LEGACY_GUILD_ID
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hmget(wallet_key(guild_id, user_id), list(CURRENCIES))
+            if legacy:
+                pipe.mget([legacy_key(user_id, cur) for cur in LEGACY_KEYS])
+            replies = await pipe.execute()
+
+        balances = {cur: int(val or 0) for cur, val in zip(CURRENCIES, replies[0])}
+        if legacy:
+            for cur, val in zip(LEGACY_KEYS, replies[1]):
+                balances[cur] += int(val or 0)
+        return balances
+
+    # --- Snapshots (réutilisés entre les écrans du shop) ---
+    async def snapshot(self, guild_id: int, user_id: int) -> Dict[str, int]:
+        now = time.monotonic()
+        cached = self._snapshots.get((guild_id, user_id))
+        if cached and cached[0] > now:
+            return dict(cached[1])
+
+        balances = await self.get_all(guild_id, user_id)
+        if len(self._snapshots) >= SNAPSHOT_MAX_USERS:
+            self._snapshots = {key: snap for key, snap in self._snapshots.items() if snap[0] > now}
+        self._snapshots[(guild_id, user_id)] = (now + SNAPSHOT_TTL, balances)
+        return dict(balances)
+
+    def invalidate(self, guild_id: int, *user_ids: int):
+        for user_id in user_ids:
+            self._snapshots.pop((guild_id, user_id), None)
+
+    def _refresh_snapshots(self, guild_id: int, balances: Dict[Tuple[int, str], int]):
+        # Le script renvoie les soldes à jour : on patche les snapshots existants
+        for (user_id, cur), val in balances.items():
+            cached = self._snapshots.get((guild_id, user_id))
+            if cached:
+                cached[1][cur] = val
+
+    # --- Atomic mutations ---
+    async def apply_many(
+        self,
+        guild_id: int,
+        changes: Dict[Tuple[int, str], int],
+        reason: str = "",
+        actor: Optional[int] = None,
+    ) -> WalletResult:
+        # {(user_id, currency): delta} -> un seul EVALSHA, refus global si découvert.
+        # Une entrée de ledger par membre modifié (raison + auteur), dans le même script
+        changes = {k: v for k, v in changes.items() if v}
+        if not self.redis:
+            return WalletResult(False, {k: 0 for k in changes})
+        if not changes:
+            return WalletResult(True, {})
+
+        per_user: Dict[int, List[Tuple[str, int]]] = {}
+        for (user_id, cur), delta in changes.items():
+            if cur not in CURRENCIES:
+                raise ValueError(f"Unknown currency: {cur}")
+            per_user.setdefault(user_id, []).append((cur, delta))
+
+        legacy = "1" if guild_id == LEGACY_GUILD_ID else "0"
+        keys, targets = [], []
+        args = [reason, actor or "", LEDGER_MAXLEN]
+        for user_id, deltas in per_user.items():
+            keys += [
+                wallet_key(guild_id, user_id), legacy_key(user_id, "petals"), legacy_key(user_id, "tickets"),
+                ledger_key(guild_id, user_id),
+            ]
+            args += [legacy, len(deltas)]
+            for cur, delta in deltas:
+                args += [cur, delta]
+                targets.append((user_id, cur))
+
+        res = await self._script(APPLY_SCRIPT)(keys=keys, args=args)
+        result = WalletResult(bool(res[0]), {t: int(v) for t, v in zip(targets, res[1:])})
+        self._refresh_snapshots(guild_id, result.balances)
+        return result
+
+    async def apply(
+        self, guild_id: int, user_id: int, reason: str = "", actor: Optional[int] = None, **deltas: int
+    ) -> WalletResult:
+        return await self.apply_many(guild_id, {(user_id, cur): d for cur, d in deltas.items()}, reason, actor)
+
+    async def credit(
+        self, guild_id: int, user_id: int, reason: str = "", actor: Optional[int] = None, **amounts: int
+    ) -> WalletResult:
+        return await self.apply(guild_id, user_id, reason, actor, **amounts)
+
+    async def debit(
+        self, guild_id: int, user_id: int, reason: str = "", actor: Optional[int] = None, **amounts: int
+    ) -> WalletResult:
+        return await self.apply(guild_id, user_id, reason, actor, **{cur: -abs(a) for cur, a in amounts.items()})
+
+    async def transfer(
+        self, guild_id: int, from_id: int, to_id: int, reason: str = "", actor: Optional[int] = None, **amounts: int
+    ) -> WalletResult:
+        changes: Dict[Tuple[int, str], int] = {}
+        for cur, amount in amounts.items():
+            changes[(from_id, cur)] = changes.get((from_id, cur), 0) - abs(amount)
+            changes[(to_id, cur)] = changes.get((to_id, cur), 0) + abs(amount)
+        return await self.apply_many(guild_id, changes, reason, actor)
+
+    async def credit_once(
+        self,
+        guild_id: int,
+        applied_key: str,
+        entries: Iterable[Tuple[int, Dict[str, int]]],
+        reason: str = "",
+        actor: Optional[int] = None,
+    ) -> List[int]:
+        # Un seul EVALSHA pour un chunk de job : crédit + marquage + ledger atomiques par membre,
+        # un membre déjà marqué dans applied_key n'est jamais recrédité (reprise après crash)
+        if not self.redis:
+            # Pas de résultat vide ici : le job avancerait son curseur sans avoir crédité le chunk
+            raise RuntimeError("Redis is unavailable, chunk not credited")
+        keys, args = [applied_key], [reason, actor or "", LEDGER_MAXLEN]
+        for user_id, deltas in entries:
+            deltas = {cur: amount for cur, amount in deltas.items() if amount}
+            for cur in deltas:
+                if cur not in CURRENCIES:
+                    raise ValueError(f"Unknown currency: {cur}")
+            keys += [wallet_key(guild_id, user_id), ledger_key(guild_id, user_id)]
+            args += [user_id, len(deltas)]
+            for cur, amount in deltas.items():
+                args += [cur, amount]
+        if len(keys) == 1:
+            return []
+        credited = [int(user_id) for user_id in await self._script(CREDIT_ONCE_SCRIPT)(keys=keys, args=args)]
+        self.invalidate(guild_id, *credited)
+        return credited
+
+    # --- Ledger ---
+    async def history(
+        self, guild_id: int, user_id: int, before: Optional[str] = None, count: int = HISTORY_PAGE_SIZE
+    ) -> Tuple[List[LedgerEntry], Optional[str]]:
+        # Du plus récent au plus ancien, une page par XREVRANGE (jamais le stream entier).
+        # before = curseur renvoyé par la page précédente (exclu) ; curseur None = dernière page
+        if not self.redis:
+            return [], None
+        rows = await self.redis.xrevrange(
+            ledger_key(guild_id, user_id), max=f"({before}" if before else "+", min="-", count=count + 1
+        )
+        entries = [LedgerEntry.from_stream(entry_id, fields) for entry_id, fields in rows[:count]]
+        return entries, entries[-1].id if len(rows) > count else None
+
+    # --- Migration petals:{id} / tickets:{id} -> wallet:{guild}:{id} ---
+    async def migrate_legacy(self, batch_size: int = MIGRATION_BATCH_SIZE) -> Dict[str, int]:
+        # SCAN par lots : le bot continue de servir les lectures (get_all additionne
+        # ancien + nouveau format) et chaque clé est déplacée atomiquement.
+        if not self.redis:
+            return {}
+
+        moved = {}
+        for cur, prefix in LEGACY_KEYS.items():
+            moved[cur] = 0
+            batch = []
+            async for key in self.redis.scan_iter(match=f"{prefix}:*", count=batch_size):
+                user_id = key.split(":", 1)[1]
+                if not user_id.isdigit():
+                    continue
+                batch.append((key, int(user_id)))
+                if len(batch) >= batch_size:
+                    moved[cur] += await self._migrate_batch(batch, cur)
+                    batch = []
+            if batch:
+                moved[cur] += await self._migrate_batch(batch, cur)
+
+        log.info("📦 Legacy wallet migration into guild %s: %s", LEGACY_GUILD_ID, moved)
+        return moved
+
+    async def _migrate_batch(self, batch: List[Tuple[str, int]], currency: str) -> int:
+        keys = []
+        for key, user_id in batch:
+            keys += [key, wallet_key(LEGACY_GUILD_ID, user_id)]
+        moved = await self._script(MIGRATE_SCRIPT)(keys=keys, args=[currency] * len(batch))
+        self.invalidate(LEGACY_GUILD_ID, *(user_id for _, user_id in batch))
+        await asyncio.sleep(0)
+        return int(moved)